@@ -0,0 +1,89 @@
+"""catalog sync versions and tombstones
+
+Revision ID: 3c1f7a9d2b40
+Revises: 98885aa9621e
+Create Date: 2026-10-19 10:12:41.208713
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f7a9d2b40'
+down_revision = '98885aa9621e'
+branch_labels = None
+depends_on = None
+
+TABLES = ("city", "place", "story", "quest", "mission", "dialogue")
+
+
+def upgrade():
+    # Fresh databases get the schema (including these triggers) from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("city"):
+        return
+
+    op.create_table(
+        'tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.Column('sync_version', sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_tombstone_sync_version'), 'tombstone', ['sync_version'], unique=False)
+
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                       server_default=sa.text("timezone('utc', now())")))
+        op.add_column(table, sa.Column('sync_version', sa.BigInteger(), nullable=True))
+        op.alter_column(table, 'updated_at', server_default=None)
+
+    op.execute("CREATE SEQUENCE IF NOT EXISTS catalog_sync_seq")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION catalog_sync_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.sync_version := nextval('catalog_sync_seq');
+            NEW.updated_at := timezone('utc', now());
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION catalog_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO tombstone (entity, entity_id, deleted_at, sync_version)
+            VALUES (TG_TABLE_NAME, OLD.id, timezone('utc', now()), nextval('catalog_sync_seq'));
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table in TABLES:
+        op.execute(f"CREATE TRIGGER {table}_sync_touch BEFORE INSERT OR UPDATE ON {table} "
+                   f"FOR EACH ROW EXECUTE FUNCTION catalog_sync_touch()")
+        op.execute(f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} "
+                   f"FOR EACH ROW EXECUTE FUNCTION catalog_sync_tombstone()")
+        # Stamps existing rows with their first sync_version through the trigger.
+        op.execute(f"UPDATE {table} SET updated_at = updated_at")
+        op.create_index(op.f(f'ix_{table}_sync_version'), table, ['sync_version'], unique=False)
+
+
+def downgrade():
+    if not sa.inspect(op.get_bind()).has_table("tombstone"):
+        return
+
+    for table in TABLES:
+        op.drop_index(op.f(f'ix_{table}_sync_version'), table_name=table)
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_touch ON {table}")
+        op.drop_column(table, 'sync_version')
+        op.drop_column(table, 'updated_at')
+
+    op.execute("DROP FUNCTION IF EXISTS catalog_sync_tombstone()")
+    op.execute("DROP FUNCTION IF EXISTS catalog_sync_touch()")
+    op.execute("DROP SEQUENCE IF EXISTS catalog_sync_seq")
+    op.drop_index(op.f('ix_tombstone_sync_version'), table_name='tombstone')
+    op.drop_table('tombstone')
@@ -0,0 +1,46 @@
+"""search indexes
+
+Revision ID: 7e2b5d41c9a8
+Revises: 3c1f7a9d2b40
+Create Date: 2026-10-19 11:03:27.540118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2b5d41c9a8'
+down_revision = '3c1f7a9d2b40'
+branch_labels = None
+depends_on = None
+
+SEARCH_FIELDS = {
+    "place": ("title", "description"),
+    "story": ("title", "description"),
+    "quest": ("title", "description"),
+    "city": ("title",),
+}
+
+
+def upgrade():
+    # Fresh databases get the schema (including these indexes) from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("city"):
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, fields in SEARCH_FIELDS.items():
+        for field in fields:
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_{field}_trgm ON {table} "
+                       f"USING gin ({field} gin_trgm_ops)")
+        document = " || ' ' || ".join(f"coalesce({field}, '')" for field in fields)
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_tsv ON {table} "
+                   f"USING gin (to_tsvector('simple'::regconfig, {document}))")
+
+
+def downgrade():
+    for table, fields in SEARCH_FIELDS.items():
+        for field in fields:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_{field}_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_tsv")
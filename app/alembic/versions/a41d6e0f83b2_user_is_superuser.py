@@ -0,0 +1,30 @@
+"""user is_superuser
+
+Revision ID: a41d6e0f83b2
+Revises: 7e2b5d41c9a8
+Create Date: 2026-10-19 12:20:05.671934
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41d6e0f83b2'
+down_revision = '7e2b5d41c9a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fresh databases get the schema from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("user"):
+        return
+
+    op.add_column('user', sa.Column('is_superuser', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.alter_column('user', 'is_superuser', server_default=None)
+
+
+def downgrade():
+    op.drop_column('user', 'is_superuser')
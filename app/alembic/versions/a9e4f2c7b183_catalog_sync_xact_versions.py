@@ -0,0 +1,91 @@
+"""catalog sync versions from transaction ids
+
+Revision ID: a9e4f2c7b183
+Revises: e5b2c8a4d1f7
+Create Date: 2026-10-20 10:04:52.318846
+
+sync_version was taken from a sequence when a row was written, so a long transaction
+could commit versions below ones already returned to clients. Versions now derive from
+the writing transaction's id, which /sync caps at the snapshot's xmin. Existing
+versions are far below the new ones, so client cursors keep working.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e4f2c7b183'
+down_revision = 'e5b2c8a4d1f7'
+branch_labels = None
+depends_on = None
+
+TABLES = ("city", "place", "story", "quest", "mission", "dialogue")
+
+
+def create_tombstone_function(version_expression: str):
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION catalog_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO tombstone (entity, entity_id, deleted_at, sync_version)
+            VALUES (TG_TABLE_NAME, OLD.id, timezone('utc', now()), {version_expression});
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def create_touch_function(version_expression: str):
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION catalog_sync_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.sync_version := {version_expression};
+            NEW.updated_at := timezone('utc', now());
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def upgrade():
+    # Fresh databases get the schema (including these functions) from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("tombstone"):
+        return
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION catalog_sync_next_version() RETURNS bigint AS $$
+        DECLARE
+            xact bigint := pg_current_xact_id()::text::bigint;
+            state text := current_setting('catalog_sync.counter', true);
+            counter bigint := 0;
+        BEGIN
+            IF coalesce(state, '') <> '' AND split_part(state, ':', 1)::bigint = xact THEN
+                counter := split_part(state, ':', 2)::bigint + 1;
+            END IF;
+            IF counter >= 16777216 THEN
+                RAISE EXCEPTION 'Too many catalog changes in one transaction';
+            END IF;
+            PERFORM set_config('catalog_sync.counter', xact || ':' || counter, true);
+            RETURN (xact << 24) + counter;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    create_touch_function("catalog_sync_next_version()")
+    create_tombstone_function("catalog_sync_next_version()")
+    op.execute("DROP SEQUENCE IF EXISTS catalog_sync_seq")
+
+
+def downgrade():
+    if not sa.inspect(op.get_bind()).has_table("tombstone"):
+        return
+
+    # Continues above the transaction-based versions so cursors stay monotonic.
+    start = op.get_bind().execute(sa.text(
+        "SELECT greatest(" + ", ".join(f"(SELECT max(sync_version) FROM {t})" for t in (*TABLES, "tombstone"))
+        + ", 0) + 1"
+    )).scalar()
+    op.execute(f"CREATE SEQUENCE IF NOT EXISTS catalog_sync_seq START {start}")
+    create_touch_function("nextval('catalog_sync_seq')")
+    create_tombstone_function("nextval('catalog_sync_seq')")
+    op.execute("DROP FUNCTION IF EXISTS catalog_sync_next_version()")
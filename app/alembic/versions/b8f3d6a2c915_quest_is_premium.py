@@ -0,0 +1,30 @@
+"""quest is_premium
+
+Revision ID: b8f3d6a2c915
+Revises: a9e4f2c7b183
+Create Date: 2026-10-20 16:27:09.604153
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f3d6a2c915'
+down_revision = 'a9e4f2c7b183'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fresh databases get the schema from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("quest"):
+        return
+
+    op.add_column('quest', sa.Column('is_premium', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.alter_column('quest', 'is_premium', server_default=None)
+
+
+def downgrade():
+    op.drop_column('quest', 'is_premium')
@@ -0,0 +1,32 @@
+"""geofence radius
+
+Revision ID: c7d94e2a1f60
+Revises: a41d6e0f83b2
+Create Date: 2026-10-19 19:02:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d94e2a1f60'
+down_revision = 'a41d6e0f83b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fresh databases get the schema from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("place"):
+        return
+
+    op.add_column('place', sa.Column('geofence_radius', sa.Float(), nullable=False, server_default='50'))
+    op.alter_column('place', 'geofence_radius', server_default=None)
+    op.add_column('mission', sa.Column('geofence_radius', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('mission', 'geofence_radius')
+    op.drop_column('place', 'geofence_radius')
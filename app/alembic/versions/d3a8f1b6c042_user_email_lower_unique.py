@@ -0,0 +1,33 @@
+"""user email lower unique
+
+Revision ID: d3a8f1b6c042
+Revises: c7d94e2a1f60
+Create Date: 2026-10-19 19:41:12.905514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8f1b6c042'
+down_revision = 'c7d94e2a1f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fresh databases get the schema from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("user"):
+        return
+
+    # Fails if existing emails differ only in case; such accounts have to be merged first.
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+    # The case-sensitive index is implied by the one above and lookups go through lower(email).
+    op.execute('DROP INDEX IF EXISTS ix_user_email')
+
+
+def downgrade():
+    op.create_index('ix_user_email', 'user', ['email'], unique=True)
+    op.drop_index('ix_user_email_lower', table_name='user')
@@ -0,0 +1,102 @@
+"""progress partition shadow tables
+
+Revision ID: e5b2c8a4d1f7
+Revises: d3a8f1b6c042
+Create Date: 2026-10-19 20:14:36.502117
+
+First step of the online move of the user progress tables to hash partitioning by
+user_id. Creates an empty partitioned shadow of each table and a trigger that mirrors
+every write to the live table into it, without blocking reads or writes; the trigger
+also logs the id of every written row in progresspartitionchange. Existing rows are then
+copied, verified and finally swapped in by `python -m app.jobs.backfill_progress_partitions`,
+which only swaps after a complete verification pass. The swap is not a migration so that
+`alembic upgrade head` on deploy never runs it before the backfill.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b2c8a4d1f7'
+down_revision = 'd3a8f1b6c042'
+branch_labels = None
+depends_on = None
+
+PARTITIONS = 16
+# table -> (column referencing another table, referenced table)
+TABLES = {
+    "userachievement": ("achievement_id", "achievement"),
+    "userquest": ("quest_id", "quest"),
+    "usermission": ("mission_id", "mission"),
+}
+
+
+def is_partitioned(table: str) -> bool:
+    relkind = op.get_bind().execute(
+        sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def upgrade():
+    # Fresh databases get the schema (already partitioned) from app.core.db.
+    if not sa.inspect(op.get_bind()).has_table("userquest") or is_partitioned("userquest"):
+        return
+
+    op.execute("CREATE TABLE progresspartitionchange (id bigserial PRIMARY KEY, table_name text NOT NULL, "
+               "row_id integer NOT NULL)")
+
+    for table, (column, referenced) in TABLES.items():
+        shadow = f"{table}_partitioned"
+        # Copies columns, types and the id default, so both tables draw ids from one sequence.
+        op.execute(f"CREATE TABLE {shadow} (LIKE {table} INCLUDING DEFAULTS) PARTITION BY HASH (user_id)")
+        op.execute(f"ALTER TABLE {shadow} ADD CONSTRAINT {shadow}_pkey PRIMARY KEY (id, user_id)")
+        op.execute(f'ALTER TABLE {shadow} ADD CONSTRAINT {table}_user_id_fkey '
+                   f'FOREIGN KEY (user_id) REFERENCES "user" (id)')
+        op.execute(f"ALTER TABLE {shadow} ADD CONSTRAINT {table}_{column}_fkey "
+                   f"FOREIGN KEY ({column}) REFERENCES {referenced} (id)")
+        # Created on the parent, so every partition gets its own copy of the index.
+        op.execute(f"CREATE UNIQUE INDEX ix_{table}_user_id_{column} ON {shadow} (user_id, {column})")
+        for remainder in range(PARTITIONS):
+            op.execute(f"CREATE TABLE {table}_p{remainder} PARTITION OF {shadow} "
+                       f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})")
+
+        # An update is mirrored as delete + insert, which also moves the row if user_id changed.
+        # Rows whose (user_id, {column}) already exists in the shadow are duplicates and are dropped.
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_partition_mirror() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM {shadow} WHERE id = OLD.id AND user_id = OLD.user_id;
+                    INSERT INTO progresspartitionchange (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {shadow} SELECT NEW.* ON CONFLICT DO NOTHING;
+                    INSERT INTO progresspartitionchange (table_name, row_id) VALUES (TG_TABLE_NAME, NEW.id);
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"CREATE TRIGGER {table}_partition_mirror AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                   f"FOR EACH ROW EXECUTE FUNCTION {table}_partition_mirror()")
+
+
+def downgrade():
+    for table in TABLES:
+        if sa.inspect(op.get_bind()).has_table(f"{table}_legacy"):
+            # The backfill job has swapped the tables: restore the old one with the current rows.
+            op.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            op.execute(f"DELETE FROM {table}_legacy")
+            op.execute(f"INSERT INTO {table}_legacy SELECT * FROM {table}")
+            op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}_legacy.id")
+            op.execute(f"DROP TABLE {table}")
+            op.execute(f"ALTER TABLE {table}_legacy RENAME TO {table}")
+            op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_legacy_pkey TO {table}_pkey")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq'::regclass)")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_partition_mirror ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_partition_mirror()")
+        op.execute(f"DROP TABLE IF EXISTS {table}_partitioned")
+    op.execute("DROP TABLE IF EXISTS progresspartitionchange")
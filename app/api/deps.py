@@ -1,4 +1,4 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 import jwt
 from datetime import timedelta
@@ -7,17 +7,28 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 from pydantic import ValidationError
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 from loguru import logger
 
 from app.core import security
+from app.core.catalog import catalog_store
 from app.core.config import settings
 from app.core.db import engine
+from app.core.db_routing import replica_router
+from app.core.entitlements import Entitlement, entitlement_cache
+from app.core.events import redeem_stream_ticket
+from app.core.queue import job_queue
 from app.core.redis import redis_manager, RedisClient
-from app.models import TokenPayload, User
+from app.core.resilience import RevocationCheckUnavailable, redis_breaker, token_revocation
+from app.models import JobAccepted, TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token",
+    auto_error=False,
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -29,6 +40,17 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+def get_token_user_id(token: str) -> int | None:
+    """
+    User id from a token, used for routing only; authentication is done by get_current_user.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+        return TokenPayload(**payload).sub
+    except (InvalidTokenError, ValidationError):
+        return None
+
+
 async def get_redis(db: int = 0) -> RedisClient:
     return redis_manager.get_client(db=db)
 
@@ -38,11 +60,58 @@ async def get_token_blacklist_redis() -> RedisClient:
 
 
 async def get_lesson_content_redis() -> RedisClient:
-    return await get_redis(db=settings.RedisDB.LESSON_CONTENT.value)
+    return await get_redis(db=settings.RedisDB.REDIS_CONTENT.value)
+
+
+async def get_inventory_redis() -> RedisClient:
+    return redis_manager.get_client(db=settings.RedisDB.REDIS_CONTENT.value, codec="bytes")
 
 
 TokenBlacklistRedisDep = Annotated[RedisClient, Depends(get_token_blacklist_redis)]
 ContentRedisDep = Annotated[RedisClient, Depends(get_lesson_content_redis)]
+InventoryRedisDep = Annotated[RedisClient, Depends(get_inventory_redis)]
+
+
+async def is_pinned_to_primary(redis: RedisClient, user_id: int) -> bool:
+    """
+    Read-your-writes lookup; when Redis cannot answer in time the read goes to a replica.
+    """
+    try:
+        return await redis_breaker.call(lambda: replica_router.is_pinned(redis, user_id),
+                                        timeout=settings.REDIS_GUARDED_CALL_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning(f"Primary pin lookup skipped, Redis unavailable: {type(e).__name__}")
+        return False
+
+
+async def get_read_db(token: TokenDep, redis: ContentRedisDep) -> AsyncGenerator[Session, None]:
+    """
+    Session for read-only endpoints: served by a replica unless the user wrote recently.
+    """
+    user_id = get_token_user_id(token)
+    if user_id is not None and await is_pinned_to_primary(redis, user_id):
+        read_engine = engine
+    else:
+        read_engine = replica_router.get_read_engine()
+    with Session(read_engine) as session:
+        yield session
+
+
+async def pin_user_to_primary(token: TokenDep, redis: ContentRedisDep) -> AsyncGenerator[None, None]:
+    """
+    Keeps the user's reads on the primary for a while after a successful write.
+    """
+    yield
+    user_id = get_token_user_id(token)
+    if user_id is not None:
+        try:
+            await redis_breaker.call(lambda: replica_router.pin_to_primary(redis, user_id),
+                                     timeout=settings.REDIS_GUARDED_CALL_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Could not pin user {user_id} to the primary: {type(e).__name__}")
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
 
 
 async def get_current_user(session: SessionDep, token: TokenDep, redis: TokenBlacklistRedisDep) -> User:
@@ -52,7 +121,13 @@ async def get_current_user(session: SessionDep, token: TokenDep, redis: TokenBla
                 status_code=401,
                 detail="Token has been revoked"
             )
+    except RevocationCheckUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication is temporarily unavailable"
+        )
 
+    try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
@@ -84,19 +159,92 @@ async def get_current_user(session: SessionDep, token: TokenDep, redis: TokenBla
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+async def get_stream_user(redis: TokenBlacklistRedisDep, content_redis: ContentRedisDep,
+                          header_token: Annotated[str | None, Depends(optional_oauth2)],
+                          ticket: str | None = None) -> User:
+    """
+    Authenticates long-lived streams with the Authorization header or a single-use
+    `?ticket=` from POST /events/ticket, for browsers that cannot set headers on an
+    EventSource. The session is closed before the stream starts instead of being held
+    for its whole lifetime.
+    """
+    with Session(engine) as session:
+        if header_token:
+            return await get_current_user(session, header_token, redis)
+        user_id = await redeem_stream_ticket(content_redis, ticket) if ticket else None
+        user = session.get(User, user_id) if user_id is not None else None
+        if not user:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        return user
+
+
+StreamUser = Annotated[User, Depends(get_stream_user)]
+
+
+def get_current_active_superuser(current_user: CurrentUser) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+    return current_user
+
+
+CurrentSuperuser = Annotated[User, Depends(get_current_active_superuser)]
+
+
+class RequireEntitlement:
+    """
+    Dependency that lets the request through only for users with an active subscription,
+    optionally restricted to the given plans.
+    """
+
+    def __init__(self, plan_ids: set[int] | None = None):
+        self.plan_ids = plan_ids
+
+    async def __call__(self, session: SessionDep, current_user: CurrentUser,
+                       redis: ContentRedisDep) -> Entitlement:
+        entitlement = await entitlement_cache.get(session, redis, current_user.id)
+        if not entitlement.is_active() or (self.plan_ids and entitlement.plan_id not in self.plan_ids):
+            logger.info(f"Entitlement check failed for user: {current_user.email}")
+            raise HTTPException(status_code=403, detail="An active subscription is required")
+        return entitlement
+
+
+class RequireQuestEntitlement(RequireEntitlement):
+    """
+    RequireEntitlement for the routes of one quest: only premium quests need the subscription.
+    """
+
+    async def __call__(self, quest_id: int, session: SessionDep, current_user: CurrentUser,
+                       redis: ContentRedisDep) -> Entitlement | None:
+        snapshot = await run_in_threadpool(catalog_store.get)
+        if quest_id not in snapshot.premium_quest_ids:
+            return None
+        return await super().__call__(session, current_user, redis)
+
+
 async def is_token_blacklisted(redis: TokenBlacklistRedisDep, token: str) -> bool:
     """
-    Checking for a blacklisted token (in Redis).
+    Checking for a blacklisted token (in Redis), with a timeout and the Redis circuit breaker.
     """
-    return await redis.get(token)
+    return await token_revocation.is_revoked(redis, token)
 
 
 async def blacklist_token(redis: TokenBlacklistRedisDep, token: str, expiration: timedelta):
     """
     Adds a token to the blacklist indicating its expiration time.
     """
+    token_revocation.forget(token)
     try:
         await redis.setex(token, expiration, "blacklisted")
     except Exception as e:
         logger.error(f"Error blacklisting token: {e}")
         raise
+
+
+async def enqueue_job(job, payload, delay: float = 0) -> JobAccepted:
+    """
+    Hands work to the background worker; routes return the result with status 202.
+    """
+    job_id = await job_queue.enqueue(job, payload, delay=delay)
+    return JobAccepted(job_id=job_id, status_url=f"{settings.API_V1_STR}/jobs/{job_id}")
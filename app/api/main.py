@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 
-from app.api.routes import login, users, stories, places, cities, quests
+from app.api.routes import (
+    login, users, stories, places, cities, quests, leaderboards, sync, search, admin, jobs, exports, map, checkin,
+    events, health, home,
+)
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
@@ -9,3 +12,14 @@ api_router.include_router(stories.router, prefix="/stories", tags=["stories"])
 api_router.include_router(places.router, prefix="/places", tags=["places"])
 api_router.include_router(cities.router, prefix="/cities", tags=["cities"])
 api_router.include_router(quests.router, prefix="/quests", tags=["quests"])
+api_router.include_router(leaderboards.router, prefix="/leaderboards", tags=["leaderboards"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
+api_router.include_router(map.router, prefix="/map", tags=["map"])
+api_router.include_router(checkin.router, prefix="/checkin", tags=["checkin"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(health.router, prefix="/health", tags=["health"])
+api_router.include_router(home.router, prefix="/home", tags=["home"])
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from loguru import logger
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.catalog import publish_catalog_change
+from app.core.config import settings
+from app.core.content_import import ContentImportError, ContentPackage, import_content
+from app.jobs import tasks
+from app.models import ImportReport, JobAccepted, LeaderboardRebuildJobPayload, QuestBundleJobPayload
+from app.api.deps import (
+    get_current_active_superuser,
+    SessionDep,
+    ContentRedisDep,
+    enqueue_job,
+)
+
+router = APIRouter()
+
+
+@router.post("/import", dependencies=[Depends(get_current_active_superuser)], response_model=ImportReport)
+async def import_content_package(session: SessionDep, redis: ContentRedisDep, package: UploadFile):
+    """
+    Bulk import of a content package: a .ndjson/.jsonl or .csv file of records, or a .zip
+    archive with the records file and the media it references.
+    """
+    try:
+        report = await run_in_threadpool(
+            import_content,
+            session,
+            ContentPackage(package.file, filename=package.filename),
+            settings.IMPORT_MEDIA_CONCURRENCY,
+        )
+    except ContentImportError as e:
+        raise HTTPException(status_code=400, detail=e.errors)
+    except IntegrityError as e:
+        logger.warning(f"Content package '{package.filename}' rejected: {e.orig}")
+        raise HTTPException(status_code=400, detail=f"Content package violates a constraint: {e.orig}")
+
+    await publish_catalog_change(redis)
+    return report
+
+
+@router.post("/quests/{quest_id}/bundle", dependencies=[Depends(get_current_active_superuser)],
+             response_model=JobAccepted, status_code=202)
+async def rebuild_quest_bundle(quest_id: int):
+    return await enqueue_job(tasks.rebuild_quest_bundle, QuestBundleJobPayload(quest_id=quest_id))
+
+
+@router.post("/leaderboards/rebuild", dependencies=[Depends(get_current_active_superuser)],
+             response_model=JobAccepted, status_code=202)
+async def rebuild_leaderboards():
+    return await enqueue_job(tasks.rebuild_leaderboards, LeaderboardRebuildJobPayload())
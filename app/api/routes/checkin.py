@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.catalog import catalog_store
+from app.core.config import settings
+from app.core.geofence import record_mission_visits, suppress_duplicates
+from app.models import CheckInRequest, CheckInResult, GeofenceEntityEnum, GeofenceTrigger
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    ContentRedisDep,
+)
+
+router = APIRouter()
+
+
+@router.post("/", response_model=CheckInResult)
+async def check_in(body: CheckInRequest, current_user: CurrentUser, session: SessionDep, redis: ContentRedisDep):
+    """
+    Matches a batch of location pings against place and mission geofences and returns the
+    ones the user has just entered. Each geofence triggers once per user until the
+    dedupe window passes; missions only trigger while their quest is in progress.
+    """
+    snapshot = await run_in_threadpool(catalog_store.get)
+    matched = snapshot.geofences.match_pings(body.pings, settings.GEOFENCE_MAX_ACCURACY_METERS)
+
+    mission_ids = [geofence.id for geofence in matched if geofence.entity == GeofenceEntityEnum.missions.value]
+    open_mission_ids = set()
+    if mission_ids:
+        open_mission_ids = await run_in_threadpool(crud.get_open_mission_ids, session, current_user.id, mission_ids)
+
+    # Every check-in inside an open mission's geofence counts as a visit, even when the
+    # trigger itself is suppressed as a duplicate.
+    await record_mission_visits(redis, current_user.id, sorted(open_mission_ids),
+                                timedelta(seconds=settings.MISSION_VISIT_SECONDS))
+
+    triggers = [
+        GeofenceTrigger(entity=geofence.entity, id=geofence.id, recorded_at=ping.recorded_at)
+        for geofence, ping in matched.items()
+        if geofence.entity == GeofenceEntityEnum.places.value or geofence.id in open_mission_ids
+    ]
+    triggers = await suppress_duplicates(redis, current_user.id, triggers,
+                                         timedelta(seconds=settings.GEOFENCE_DEDUPE_SECONDS))
+    return CheckInResult(data=triggers, count=len(triggers))
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.events import TooManyStreams, event_hub, issue_stream_ticket
+from app.api.deps import ContentRedisDep, CurrentUser, StreamUser
+from app.models import StreamTicket
+
+router = APIRouter()
+
+
+@router.post("/ticket", response_model=StreamTicket)
+async def create_stream_ticket(current_user: CurrentUser, redis: ContentRedisDep):
+    """
+    Single-use ticket for opening an event stream with `?ticket=`, so that bearer tokens
+    never appear in URLs and access logs.
+    """
+    ticket = await issue_stream_ticket(redis, current_user.id, settings.EVENTS_TICKET_SECONDS)
+    return StreamTicket(ticket=ticket, expires_in=settings.EVENTS_TICKET_SECONDS)
+
+
+@router.get("/", response_class=StreamingResponse)
+async def stream_events(current_user: StreamUser):
+    """
+    Server-sent events with the user's progress, artifact and achievement updates and catalog
+    version changes. Authenticate with the Authorization header or `?ticket=`.
+    """
+    try:
+        event_hub.check_capacity(current_user.id)
+    except TooManyStreams as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return StreamingResponse(
+        event_hub.stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.export import MEDIA_TYPES, stream_export
+from app.models import ExportEntityEnum, ExportFormatEnum
+from app.api.deps import get_current_active_superuser
+
+router = APIRouter()
+
+
+@router.get("/{entity}", dependencies=[Depends(get_current_active_superuser)])
+def export_entity(
+        entity: ExportEntityEnum,
+        format: ExportFormatEnum = Query(default=ExportFormatEnum.ndjson),
+        gzip: bool = Query(default=False),
+):
+    """
+    Full dump of a table as NDJSON or CSV, streamed from a server-side cursor and
+    optionally gzip-compressed on the fly.
+    """
+    filename = f"{entity.value}.{format.value}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(entity.value, format.value, gzip, settings.EXPORT_BATCH_SIZE, settings.EXPORT_CHUNK_BYTES),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
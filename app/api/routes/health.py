@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Response
+
+from app.core.redis import redis_metrics
+from app.core.resilience import CircuitBreaker, redis_breaker, token_revocation
+from app.core.warmup import warmup
+from app.models import HealthPublic, ReadinessPublic
+
+router = APIRouter()
+
+
+@router.get("/", response_model=HealthPublic)
+def get_health():
+    """
+    State of this worker's Redis circuit breaker and Redis call latencies.
+    """
+    return HealthPublic(
+        status="ok" if redis_breaker.state == CircuitBreaker.CLOSED else "degraded",
+        breakers={redis_breaker.name: redis_breaker.snapshot()},
+        token_revocation=token_revocation.snapshot(),
+        redis_commands=redis_metrics.snapshot(),
+    )
+
+
+@router.get("/ready", response_model=ReadinessPublic)
+def get_readiness(response: Response):
+    """
+    Readiness probe: 503 until every worker of the server has finished its startup
+    warm-up, then 200. The body reports what each warm-up step of this worker did.
+    """
+    readiness = warmup.snapshot()
+    if not readiness.ready:
+        response.status_code = 503
+    return readiness
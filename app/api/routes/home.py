@@ -0,0 +1,53 @@
+import asyncio
+
+import orjson
+from fastapi import APIRouter, Header, Query, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core.catalog import catalog_store, content_etag
+from app.core.home import encode_sections, get_cities_with_progress, parse_if_none_match
+from app.models import HomePublic, HomeSectionEnum, UserPublic
+from app.api.deps import ReadSessionDep, CurrentUser
+
+router = APIRouter()
+
+CATALOG_SECTIONS = (HomeSectionEnum.stories, HomeSectionEnum.places, HomeSectionEnum.quests)
+
+
+@router.get("/", response_model=HomePublic)
+async def get_home(session: ReadSessionDep, current_user: CurrentUser,
+                   sections: list[HomeSectionEnum] = Query(default=list(HomeSectionEnum)),
+                   if_none_match: str | None = Header(default=None)):
+    """
+    Everything the app needs on launch in one authenticated request: each requested
+    section carries the same body as its own endpoint (`me` as /users/me) and an ETag.
+    Sections whose ETag is listed in If-None-Match come back with `not_modified` and no data.
+
+    Catalog sections are served from the catalog snapshot with precomputed ETags; `me`
+    and `cities` are loaded per user, concurrently with the snapshot lookup.
+    """
+    wanted = set(sections)
+
+    async def load_cities() -> bytes | None:
+        if HomeSectionEnum.cities not in wanted:
+            return None
+        cities = await run_in_threadpool(get_cities_with_progress, session, current_user.id)
+        return orjson.dumps([city.model_dump(mode="json") for city in cities])
+
+    snapshot, cities = await asyncio.gather(run_in_threadpool(catalog_store.get), load_cities())
+
+    bodies = []
+    if HomeSectionEnum.me in wanted:
+        me = orjson.dumps(UserPublic.model_validate(current_user).model_dump(mode="json"))
+        bodies.append((HomeSectionEnum.me.value, content_etag(me), me))
+    if cities is not None:
+        bodies.append((HomeSectionEnum.cities.value, content_etag(cities), cities))
+    for section in CATALOG_SECTIONS:
+        if section in wanted:
+            bodies.append((section.value, snapshot.etags[section.value], getattr(snapshot, section.value)))
+
+    return Response(
+        content=encode_sections(bodies, parse_if_none_match(if_none_match)),
+        media_type="application/json",
+        headers={"Cache-Control": "private, no-cache"},
+    )
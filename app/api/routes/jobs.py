@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.queue import job_queue
+from app.models import JobStatusPublic
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", dependencies=[Depends(get_current_user)], response_model=JobStatusPublic)
+async def get_job_status(job_id: str):
+    status = await job_queue.get_status(job_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
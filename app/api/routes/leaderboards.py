@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Query
+
+from app.core import leaderboard
+from app.models import LeaderboardMetricEnum, LeaderboardPublic
+from app.api.deps import (
+    CurrentUser,
+    ContentRedisDep,
+)
+
+router = APIRouter()
+
+
+@router.get("/{metric}", response_model=LeaderboardPublic)
+async def get_leaderboard(
+        metric: LeaderboardMetricEnum,
+        current_user: CurrentUser,
+        redis: ContentRedisDep,
+        city_id: int | None = None,
+        offset: int = Query(default=0, ge=0),
+        limit: int = Query(default=50, ge=1, le=100),
+):
+    entries, count = await leaderboard.get_top(redis, metric, city_id=city_id, offset=offset, limit=limit)
+    me = await leaderboard.get_user_rank(redis, metric, current_user.id, city_id=city_id)
+
+    return LeaderboardPublic(data=entries, count=count, me=me)
@@ -8,7 +8,14 @@ from pydantic import ValidationError
 from loguru import logger
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep, TokenBlacklistRedisDep, blacklist_token, TokenDep
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    TokenBlacklistRedisDep,
+    blacklist_token,
+    TokenDep,
+    pin_user_to_primary,
+)
 from app.core import security
 from app.core.config import settings
 from app.models import Token, Message
@@ -45,7 +52,7 @@ def login_access_token(session: SessionDep, form_data: Annotated[OAuth2PasswordR
     return Token(access_token=access_token)
 
 
-@router.post("/logout")
+@router.post("/logout", dependencies=[Depends(pin_user_to_primary)])
 async def logout_user(current_user: CurrentUser, token: TokenDep, redis_client: TokenBlacklistRedisDep) -> Message:
     """
     User logout. Token is blacklisted.
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.catalog import catalog_store
+from app.core.config import settings
+from app.core.map_clusters import viewport_tiles
+from app.models import MapClustersPublic
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+
+def parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    try:
+        min_longitude, min_latitude, max_longitude, max_latitude = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+    if not (-180 <= min_longitude <= 180 and -180 <= max_longitude <= 180
+            and -90 <= min_latitude <= max_latitude <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range")
+    return min_longitude, min_latitude, max_longitude, max_latitude
+
+
+@router.get("/clusters", dependencies=[Depends(get_current_user)], response_model=MapClustersPublic)
+def get_clusters(
+        bbox: str = Query(description="min_lon,min_lat,max_lon,max_lat; min_lon > max_lon crosses the antimeridian"),
+        zoom: int = Query(ge=0, le=22),
+):
+    """
+    Places and cities in the viewport, grouped into clusters for the zoom level. The
+    viewport may span at most MAP_MAX_VIEWPORT_TILES map tiles each way at that zoom.
+    """
+    zoom = min(zoom, settings.MAP_MAX_ZOOM)
+    viewport = parse_bbox(bbox)
+    if max(viewport_tiles(*viewport, zoom=zoom)) > settings.MAP_MAX_VIEWPORT_TILES:
+        raise HTTPException(status_code=400, detail=f"bbox is too large for zoom {zoom}")
+    clusters = catalog_store.get().map_index.query(*viewport, zoom=zoom)
+    return MapClustersPublic(data=clusters, count=len(clusters), zoom=zoom)
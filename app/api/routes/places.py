@@ -1,45 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import select
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 
-from app.core.minio_handler import minio_client
-from app.models import Place, PlacePublic, PlaceDetailPublic
-from app.api.deps import (
-    get_current_user,
-    SessionDep,
-)
+from app.core.catalog import catalog_store
+from app.models import PlacePublic, PlaceDetailPublic
+from app.api.deps import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/", dependencies=[Depends(get_current_user)], response_model=List[PlacePublic])
-def get_places(session: SessionDep):
-    statement = select(Place).order_by(Place.created_at.desc())
-    places = session.exec(statement).all()
-
-    return [
-        PlacePublic(
-            id=place.id,
-            title=place.title,
-            picture_small_url=minio_client.get_object_url("places-bucket", place.picture_small_url),
-            latitude=place.latitude,
-            longitude=place.longitude
-        )
-        for place in places
-    ]
+def get_places():
+    return Response(content=catalog_store.get().places, media_type="application/json")
 
 
 @router.get("/{place_id}", dependencies=[Depends(get_current_user)], response_model=PlaceDetailPublic)
-def get_place_detail(place_id: int, session: SessionDep):
-    place = session.get(Place, place_id)
+def get_place_detail(place_id: int):
+    place = catalog_store.get().place_details.get(place_id)
     if not place:
         raise HTTPException(status_code=404, detail="Place not found")
 
-    return PlaceDetailPublic(
-        id=place.id,
-        title=place.title,
-        picture_big_url=minio_client.get_object_url("places-bucket", place.picture_big_url),
-        description=place.description,
-        latitude=place.latitude,
-        longitude=place.longitude
-    )
+    return Response(content=place, media_type="application/json")
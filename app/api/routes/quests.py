@@ -1,70 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from starlette.concurrency import run_in_threadpool
 from typing import List
-from sqlmodel import select
 
+from app.core import leaderboard
+from app.core.catalog import catalog_store
+from app.core.events import publish_user_event
+from app.core.geofence import has_visited_mission
+from app.core.home import parse_if_none_match
+from app.core.inventory import collect_piece, load_inventory
 from app.core.minio_handler import minio_client
-from app.models import QuestPublic, CityPublic, Quest, Mission, Dialogue
+from app.core.quest_bundle import quest_bundle_store
+from app.models import (
+    EventTypeEnum,
+    Mission,
+    MissionCompletionPublic,
+    QuestPublic,
+    QuestBundlePublic,
+    QuestStatusEnum,
+)
 from app import crud
 from app.api.deps import (
     get_current_user,
+    ReadSessionDep,
     SessionDep,
     CurrentUser,
+    ContentRedisDep,
+    InventoryRedisDep,
+    RequireQuestEntitlement,
+    pin_user_to_primary,
 )
 
 router = APIRouter()
 
 
 @router.get("/", dependencies=[Depends(get_current_user)], response_model=List[QuestPublic])
-def get_quests(session: SessionDep):
-    results = crud.get_quests_with_cities(session)
-
-    quests_with_cities = [
-        QuestPublic(
-            id=quest.id,
-            title=quest.name,
-            description=quest.description,
-            picture_small_url=minio_client.get_object_url("quests-bucket", quest.picture_small_url),
-            city=CityPublic(
-                id=city.id,
-                title=city.title,
-                latitude=city.latitude,
-                longitude=city.longitude
-            )
-        )
-        for quest, city in results
-    ]
-
-    return quests_with_cities
-
-
-@router.get("/{quest_id}", dependencies=[Depends(get_current_user)])
-def get_quest(quest_id: int, session: SessionDep, current_user: CurrentUser):
-    quest = session.exec(select(Quest).where(Quest.id == quest_id)).first()
+def get_quests():
+    return Response(content=catalog_store.get().quests, media_type="application/json")
+
+
+@router.get("/{quest_id}", dependencies=[Depends(get_current_user), Depends(RequireQuestEntitlement())])
+def get_quest(quest_id: int, session: ReadSessionDep, current_user: CurrentUser):
+    quest = crud.get_quest_detail(session, quest_id)
     if not quest:
         raise HTTPException(status_code=404, detail="Quest not found")
 
-    missions = session.exec(select(Mission).where(Mission.quest_id == quest_id).order_by(Mission.mission_order)).all()
-
-    detailed_missions = []
-    for mission in missions:
-        dialogues = session.exec(
-            select(Dialogue).where(Dialogue.mission_id == mission.id).order_by(Dialogue.order)).all()
-
-        detailed_missions.append({
-            "mission_id": mission.id,
-            "name": mission.name,
-            "description": mission.description,
-            "dialogues": [{
-                "character_name": d.character_name,
-                "text": d.text,
-                "background_url": minio_client.get_object_url("backgrounds-bucket", d.background_url),
-                "character_image_url": minio_client.get_object_url("characters-bucket", d.character_image_url)
-            } for d in dialogues]
-        })
-
     return {
-        "quest_id": quest.id,
-        "title": quest.title,
-        "description": quest.description,
-        "missions": detailed_missions
+        **quest,
+        "missions": [
+            {
+                **mission,
+                "dialogues": [{
+                    **d,
+                    "background_url": minio_client.get_object_url("backgrounds-bucket", d["background_url"]),
+                    "character_image_url": minio_client.get_object_url("characters-bucket",
+                                                                       d["character_image_url"])
+                } for d in mission["dialogues"]]
+            }
+            for mission in quest["missions"]
+        ]
     }
+
+
+@router.get("/{quest_id}/bundle", dependencies=[Depends(get_current_user), Depends(RequireQuestEntitlement())],
+            response_model=QuestBundlePublic)
+def get_quest_bundle(quest_id: int, response: Response,
+                     if_none_match: str | None = Header(default=None)):
+    """
+    Offline bundle of a quest. Clients compare the hash (also sent as ETag) with the
+    bundle they already have and only download the archive when it changed.
+    """
+    bundle = quest_bundle_store.get(quest_id, catalog_store.get().version)
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Quest not found")
+
+    etag = f'"{bundle.hash}"'
+    if parse_if_none_match(if_none_match) & {etag, "*"}:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return bundle
+
+
+@router.post("/{quest_id}/missions/{mission_id}/complete",
+             dependencies=[Depends(pin_user_to_primary), Depends(RequireQuestEntitlement())],
+             response_model=MissionCompletionPublic)
+async def complete_mission(quest_id: int, mission_id: int, session: SessionDep, current_user: CurrentUser,
+                           redis: ContentRedisDep, inventory_redis: InventoryRedisDep):
+    """
+    Completes a mission of a quest the user is playing, adds its reward piece to the
+    artifact inventory and completes the quest once all its missions are done. A mission
+    with a geofence requires a check-in inside it within MISSION_VISIT_SECONDS.
+    """
+    mission = await run_in_threadpool(session.get, Mission, mission_id)
+    if not mission or mission.quest_id != quest_id:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    user_quest = await run_in_threadpool(crud.get_user_quest, session, current_user.id, quest_id)
+    if not user_quest or user_quest.status != QuestStatusEnum.in_progress:
+        raise HTTPException(status_code=409, detail="Quest is not in progress")
+    if mission.geofence_radius is not None and not await has_visited_mission(redis, current_user.id, mission_id):
+        raise HTTPException(status_code=403, detail="Mission location has not been visited")
+    quest = await run_in_threadpool(crud.get_quest_by_id, session, quest_id)
+    city_id = mission.city_id or quest.city_id
+
+    piece_id = mission.reward_artifact_piece_id
+    if piece_id is not None:
+        # A lost inventory is rebuilt from completed missions, so it has to happen before
+        # this mission is stored as completed, or the new piece would already be in it.
+        await load_inventory(inventory_redis, session, current_user.id)
+
+    newly_completed = await run_in_threadpool(crud.complete_user_mission, session, current_user.id, mission_id)
+    result = MissionCompletionPublic(mission_id=mission_id, newly_completed=newly_completed, quest_completed=False)
+    if newly_completed:
+        await publish_user_event(redis, current_user.id, EventTypeEnum.progress,
+                                 {"quest_id": quest_id, "mission_id": mission_id, "status": "completed"})
+
+    if newly_completed and piece_id is not None:
+        if await collect_piece(inventory_redis, current_user.id, piece_id):
+            result.reward_artifact_piece_id = piece_id
+            await leaderboard.record_artifact_piece_collected(redis, current_user.id, city_id)
+            snapshot = await run_in_threadpool(catalog_store.get)
+            await publish_user_event(redis, current_user.id, EventTypeEnum.artifact,
+                                     {"artifact_id": snapshot.piece_artifacts.get(piece_id), "piece_id": piece_id})
+            artifact = snapshot.artifacts.get(snapshot.piece_artifacts.get(piece_id))
+            if artifact:
+                inventory = await load_inventory(inventory_redis, session, current_user.id)
+                result.artifact = artifact.progress(inventory)
+
+    if newly_completed and await run_in_threadpool(crud.complete_quest_if_done, session, user_quest):
+        result.quest_completed = True
+        await leaderboard.record_quest_completed(redis, current_user.id, quest.city_id)
+        await publish_user_event(redis, current_user.id, EventTypeEnum.progress,
+                                 {"quest_id": quest_id, "status": "completed"})
+
+    return result
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models import SearchEntityEnum, SearchResultsPublic
+from app import crud
+from app.api.deps import (
+    get_current_user,
+    ReadSessionDep,
+)
+
+router = APIRouter()
+
+
+@router.get("/", dependencies=[Depends(get_current_user)], response_model=SearchResultsPublic)
+def search(
+        session: ReadSessionDep,
+        q: str = Query(min_length=2, max_length=100),
+        types: list[SearchEntityEnum] | None = Query(default=None),
+        offset: int = Query(default=0, ge=0),
+        limit: int = Query(default=20, ge=1, le=100),
+):
+    """
+    Typo-tolerant, ranked search across places, stories, quests and cities.
+    """
+    hits, count = crud.search_catalog(session, q.strip(), entities=types, offset=offset, limit=limit)
+    return SearchResultsPublic(data=hits, count=count)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.config import settings
+from app.core.minio_handler import minio_client
+from app.models import SyncChangesPublic, TombstonePublic
+from app import crud
+from app.api.deps import (
+    get_current_user,
+    ReadSessionDep,
+)
+
+router = APIRouter()
+
+MEDIA_FIELDS = {
+    "cities": {"picture_small_url": "cities-bucket"},
+    "places": {"picture_small_url": "places-bucket", "picture_big_url": "places-bucket"},
+    "stories": {"picture_small_url": "stories-bucket", "picture_big_url": "stories-bucket"},
+    "dialogues": {"background_url": "backgrounds-bucket", "character_image_url": "characters-bucket"},
+}
+
+
+def serialize_row(entity: str, row) -> dict:
+    data = row.model_dump(exclude={"sync_version"})
+    for field, bucket in MEDIA_FIELDS.get(entity, {}).items():
+        data[field] = minio_client.get_object_url(bucket, data[field])
+    return data
+
+
+@router.get("/", dependencies=[Depends(get_current_user)], response_model=SyncChangesPublic)
+def get_changes_since(session: ReadSessionDep, since: int = Query(default=0, ge=0),
+                      limit: int = Query(default=settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE)):
+    """
+    Catalog rows changed or deleted after the `since` cursor. Pass the returned cursor
+    as `since` on the next call; keep calling while `has_more` is true.
+    """
+    changes, tombstones, cursor, has_more = crud.get_catalog_changes(session, since=since, limit=limit)
+
+    return SyncChangesPublic(
+        cursor=cursor,
+        has_more=has_more,
+        changes={entity: [serialize_row(entity, row) for row in rows] for entity, rows in changes.items()},
+        deleted=[
+            TombstonePublic(entity=t.entity, entity_id=t.entity_id, deleted_at=t.deleted_at)
+            for t in tombstones
+        ],
+    )
@@ -2,14 +2,20 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
+from starlette.concurrency import run_in_threadpool
 
 from app import crud
+from app.core.catalog import catalog_store
+from app.core.inventory import load_inventory
 from app.api.deps import (
     CurrentUser,
     SessionDep,
+    InventoryRedisDep,
     get_current_user,
+    pin_user_to_primary,
 )
 from app.models import (
+    ArtifactCollectionPublic,
     UserCreate,
     UserPublic,
     UserUpdate,
@@ -19,20 +25,15 @@ from app.models import (
 router = APIRouter()
 
 
-@router.patch("/me", dependencies=[Depends(get_current_user)], response_model=UserPublic)
+@router.patch("/me", dependencies=[Depends(get_current_user), Depends(pin_user_to_primary)],
+              response_model=UserPublic)
 def update_user_me(*, session: SessionDep, user_in: UserUpdate, current_user: CurrentUser) -> Any:
-    if user_in.email:
-        existing_user = crud.get_user_by_email(session=session, email=user_in.email)
-        if existing_user and existing_user.id != current_user.id:
-            raise HTTPException(
-                status_code=409, detail="User with this email already exists"
-            )
-    user_data = user_in.model_dump(exclude_unset=True)
-    current_user.sqlmodel_update(user_data)
-    session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
-    return current_user
+    try:
+        return crud.update_user(session=session, db_user=current_user, user_in=user_in)
+    except crud.EmailAlreadyExistsError:
+        raise HTTPException(
+            status_code=409, detail="User with this email already exists"
+        )
 
 
 @router.get("/me", response_model=UserPublic)
@@ -40,23 +41,31 @@ def read_user_me(current_user: CurrentUser) -> Any:
     return current_user
 
 
+@router.get("/me/artifacts", response_model=ArtifactCollectionPublic)
+async def read_user_artifacts(session: SessionDep, current_user: CurrentUser, redis: InventoryRedisDep) -> Any:
+    """
+    The user's whole artifact collection, computed from one bitset lookup.
+    """
+    inventory = await load_inventory(redis, session, current_user.id)
+    snapshot = await run_in_threadpool(catalog_store.get)
+    artifacts = [mask.progress(inventory) for mask in snapshot.artifacts.values()]
+    return ArtifactCollectionPublic(
+        data=artifacts,
+        completed_count=sum(artifact.complete for artifact in artifacts),
+    )
+
+
 @router.post("/signup", response_model=UserPublic)
 def register_user(session: SessionDep, user_in: UserRegister) -> Any:
-    check_email_unique(session=session, email=user_in.email)
-
     user_create = UserCreate.model_validate(user_in)
-    user = crud.create_user(session=session, user_create=user_create)
-
-    logger.info(f"User registered with email: {user_in.email}")
-
-    return user
-
-
-def check_email_unique(session: SessionDep, email: str, exclude_user_id: int = None):
-    user = crud.get_user_by_email(session=session, email=email)
-    if user and user.id != exclude_user_id:
-        logger.warning(f"Email already in use: {email}")
+    try:
+        user = crud.create_user(session=session, user_create=user_create)
+    except crud.EmailAlreadyExistsError:
         raise HTTPException(
             status_code=409,
             detail="User with this email already exists"
         )
+
+    logger.info(f"User registered with email: {user_in.email}")
+
+    return user
@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+import orjson
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.config import settings
+from app.core.db_routing import replica_router
+from app.core.geofence import Geofence, GeofenceIndex
+from app.core.inventory import ArtifactMask, build_artifact_masks
+from app.core.map_clusters import MapClusterIndex
+from app.core.minio_handler import minio_client
+from app.core.redis import RedisClient, redis_manager
+from app.models import (
+    MapMarker,
+    PlaceDetailPublic,
+    PlacePublic,
+    QuestPublic,
+    StoriesPublic,
+    StoryPublic,
+)
+
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_INVALIDATION_CHANNEL = "catalog:invalidate"
+
+
+async def publish_catalog_change(redis: RedisClient) -> int:
+    """
+    Bumps the catalog version and notifies every worker that catalog caches are stale.
+    """
+    version = await redis.incr(CATALOG_VERSION_KEY)
+    await redis.publish(CATALOG_INVALIDATION_CHANNEL, str(version))
+    logging.info(f"Catalog version bumped to {version}.")
+    return version
+
+
+def content_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, list):
+        return orjson.dumps([item.model_dump(mode="json") for item in value])
+    return orjson.dumps(value.model_dump(mode="json"))
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable catalog of one version with response bodies already encoded.
+    """
+    version: int
+    loaded_at: float
+    places: bytes
+    stories: bytes
+    quests: bytes
+    map_index: MapClusterIndex
+    geofences: GeofenceIndex
+    artifacts: dict[int, ArtifactMask]
+    piece_artifacts: dict[int, int]
+    premium_quest_ids: frozenset[int] = frozenset()
+    place_details: dict[int, bytes] = field(default_factory=dict)
+    story_details: dict[int, bytes] = field(default_factory=dict)
+    etags: dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for name in ("places", "stories", "quests"):
+            self.etags[name] = content_etag(getattr(self, name))
+
+
+def build_catalog_snapshot(session: Session, version: int) -> CatalogSnapshot:
+    places = crud.get_places(session)
+    stories = [
+        StoryPublic(
+            id=story.id,
+            title=story.title,
+            description=story.description,
+            picture_small_url=minio_client.get_object_url("stories-bucket", story.picture_small_url),
+            picture_big_url=minio_client.get_object_url("stories-bucket", story.picture_big_url),
+            created_at=story.created_at,
+        )
+        for story in crud.get_stories(session)
+    ]
+    quests = [
+        QuestPublic(
+            id=quest.id,
+            title=quest.title,
+            description=quest.description,
+            picture_small_url=minio_client.get_object_url("cities-bucket", quest.city_picture_small_url),
+            city=quest.city_title,
+            is_premium=quest.is_premium,
+        )
+        for quest in crud.get_quests_with_cities(session)
+    ]
+    markers = [
+        MapMarker(
+            entity="cities",
+            id=city.id,
+            title=city.title,
+            picture_small_url=minio_client.get_object_url("cities-bucket", city.picture_small_url),
+            latitude=city.latitude,
+            longitude=city.longitude,
+        )
+        for city in crud.get_city_locations(session)
+    ] + [
+        MapMarker(
+            entity="places",
+            id=place.id,
+            title=place.title,
+            picture_small_url=minio_client.get_object_url("places-bucket", place.picture_small_url),
+            latitude=place.latitude,
+            longitude=place.longitude,
+        )
+        for place in places
+    ]
+    geofences = [
+        Geofence("places", place.id, place.latitude, place.longitude, place.geofence_radius)
+        for place in places
+    ] + [
+        Geofence("missions", mission_id, latitude, longitude, radius)
+        for mission_id, latitude, longitude, radius in crud.get_mission_geofences(session)
+    ]
+
+    artifact_pieces = crud.get_artifact_pieces(session)
+
+    return CatalogSnapshot(
+        version=version,
+        loaded_at=time.monotonic(),
+        places=_encode([
+            PlacePublic(
+                title=place.title,
+                picture_small_url=minio_client.get_object_url("places-bucket", place.picture_small_url),
+                latitude=place.latitude,
+                longitude=place.longitude,
+            )
+            for place in places
+        ]),
+        stories=_encode(StoriesPublic(data=stories, count=len(stories))),
+        quests=_encode(quests),
+        premium_quest_ids=frozenset(quest.id for quest in quests if quest.is_premium),
+        map_index=MapClusterIndex.build(markers, settings.MAP_MAX_ZOOM, settings.MAP_CLUSTER_CELL_SHIFT),
+        geofences=GeofenceIndex.build(geofences, settings.GEOFENCE_CELL_METERS),
+        artifacts=build_artifact_masks(artifact_pieces),
+        piece_artifacts={piece_id: artifact_id for artifact_id, _, piece_id in artifact_pieces},
+        place_details={
+            place.id: _encode(PlaceDetailPublic(
+                title=place.title,
+                picture_big_url=minio_client.get_object_url("places-bucket", place.picture_big_url),
+                description=place.description,
+                latitude=place.latitude,
+                longitude=place.longitude,
+            ))
+            for place in places
+        },
+        story_details={story.id: _encode(story) for story in stories},
+    )
+
+
+class CatalogStore:
+    """
+    Per-worker holder of the current CatalogSnapshot. The snapshot is built on first use
+    and rebuilt off the event loop when an invalidation arrives; readers keep using the
+    previous snapshot until the new one replaces it in a single reference assignment.
+    """
+
+    def __init__(self, check_interval: float, max_age: float):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = threading.Lock()
+        self._listener: asyncio.Task | None = None
+        self.reload_hooks: list = []
+
+    def _current_version(self) -> int:
+        redis = redis_manager.get_sync_connection(settings.RedisDB.REDIS_CONTENT.value)
+        return int(redis.get(CATALOG_VERSION_KEY) or 0)
+
+    def _load(self) -> CatalogSnapshot:
+        # Always from the primary: a lagging replica would be stamped with the new version
+        # and served until the next invalidation.
+        version = self._current_version()
+        with Session(replica_router.primary) as session:
+            self._snapshot = build_catalog_snapshot(session, version)
+        logging.info(f"Catalog snapshot version {version} loaded.")
+        return self._snapshot
+
+    def _loaded(self, snapshot: CatalogSnapshot) -> CatalogSnapshot:
+        for hook in self.reload_hooks:
+            hook(snapshot)
+        return snapshot
+
+    def reload(self) -> CatalogSnapshot:
+        with self._lock:
+            snapshot = self._load()
+        return self._loaded(snapshot)
+
+    def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                return snapshot
+            snapshot = self._load()
+        return self._loaded(snapshot)
+
+    def on_reload(self, hook):
+        """
+        Registers a callable that receives every new snapshot, e.g. to drop derived caches.
+        """
+        self.reload_hooks.append(hook)
+        return hook
+
+    def _is_outdated(self, version: int) -> bool:
+        snapshot = self._snapshot
+        return snapshot is not None and (
+            snapshot.version != version or time.monotonic() - snapshot.loaded_at > self.max_age
+        )
+
+    async def _listen(self):
+        redis = redis_manager.get_connection(settings.RedisDB.REDIS_CONTENT.value)
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(CATALOG_INVALIDATION_CHANNEL)
+                checked_at = time.monotonic()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        if self._snapshot is not None:
+                            await run_in_threadpool(self.reload)
+                        continue
+                    # Safety net for missed messages and for edits made outside publish_catalog_change.
+                    if time.monotonic() - checked_at >= self.check_interval:
+                        checked_at = time.monotonic()
+                        version = int(await redis.get(CATALOG_VERSION_KEY) or 0)
+                        if self._is_outdated(version):
+                            await run_in_threadpool(self.reload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Catalog invalidation listener failed, resubscribing: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start_listener(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+catalog_store = CatalogStore(
+    check_interval=settings.CATALOG_SNAPSHOT_CHECK_SECONDS,
+    max_age=settings.CATALOG_SNAPSHOT_MAX_AGE_SECONDS,
+)
+
+
+@catalog_store.on_reload
+def _drop_quest_details(snapshot: CatalogSnapshot):
+    crud.get_quest_detail.loader.invalidate(generation=snapshot.version)
@@ -0,0 +1,72 @@
+# Tables whose changes are published through the /sync endpoint.
+CATALOG_SYNC_TABLES = ("city", "place", "story", "quest", "mission", "dialogue")
+
+# A sync_version is the writing transaction's id shifted left by this many bits plus a
+# per-transaction counter, so versions follow transaction id order.
+XACT_VERSION_BITS = 24
+
+# Every transaction with an id below the snapshot's xmin has finished, and every later
+# one will get a larger id: versions up to this watermark can no longer appear or change.
+# Works on hot standbys too, where the snapshot reflects the primary's transactions.
+SYNC_WATERMARK_QUERY = (
+    f"SELECT (pg_snapshot_xmin(pg_current_snapshot())::text::bigint << {XACT_VERSION_BITS}) - 1"
+)
+
+
+def catalog_sync_functions_ddl() -> list[str]:
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION catalog_sync_next_version() RETURNS bigint AS $$
+        DECLARE
+            xact bigint := pg_current_xact_id()::text::bigint;
+            state text := current_setting('catalog_sync.counter', true);
+            counter bigint := 0;
+        BEGIN
+            IF coalesce(state, '') <> '' AND split_part(state, ':', 1)::bigint = xact THEN
+                counter := split_part(state, ':', 2)::bigint + 1;
+            END IF;
+            IF counter >= {1 << XACT_VERSION_BITS} THEN
+                RAISE EXCEPTION 'Too many catalog changes in one transaction';
+            END IF;
+            PERFORM set_config('catalog_sync.counter', xact || ':' || counter, true);
+            RETURN (xact << {XACT_VERSION_BITS}) + counter;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION catalog_sync_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.sync_version := catalog_sync_next_version();
+            NEW.updated_at := timezone('utc', now());
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION catalog_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO tombstone (entity, entity_id, deleted_at, sync_version)
+            VALUES (TG_TABLE_NAME, OLD.id, timezone('utc', now()), catalog_sync_next_version());
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+    ]
+
+
+def catalog_sync_ddl() -> list[str]:
+    """
+    Functions and triggers that stamp every catalog insert/update with a sync_version
+    and record a tombstone for every delete.
+    """
+    statements = catalog_sync_functions_ddl()
+    for table in CATALOG_SYNC_TABLES:
+        statements += [
+            f"DROP TRIGGER IF EXISTS {table}_sync_touch ON {table}",
+            f"CREATE TRIGGER {table}_sync_touch BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION catalog_sync_touch()",
+            f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}",
+            f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION catalog_sync_tombstone()",
+        ]
+    return statements
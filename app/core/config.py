@@ -1,8 +1,9 @@
 import secrets
-from typing import Any
+from typing import Annotated, Any
 from enum import Enum
 
 from pydantic import (
+    BeforeValidator,
     PostgresDsn,
     computed_field,
 )
@@ -27,6 +28,19 @@ class Settings(BaseSettings):
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 1
 
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int | None = None  # По умолчанию по числу доступных CPU
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_MAX_REQUESTS: int | None = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"  # Адреса прокси через запятую, которым доверяем X-Forwarded-*
+    SERVER_READINESS_DIR: str | None = None  # Общий каталог готовности воркеров, задаётся app.serve
+
+    WORKER_CONCURRENCY: int = 10
+
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
@@ -45,10 +59,79 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Хосты реплик в формате host или host:port, через запятую
+    POSTGRES_REPLICA_SERVERS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> list[PostgresDsn]:
+        uris = []
+        for server in self.POSTGRES_REPLICA_SERVERS:
+            host, _, port = server.partition(":")
+            uris.append(MultiHostUrl.build(
+                scheme="postgresql+psycopg",
+                username=self.POSTGRES_USER,
+                password=self.POSTGRES_PASSWORD,
+                host=host,
+                port=int(port) if port else self.POSTGRES_PORT,
+                path=self.POSTGRES_DB,
+            ))
+        return uris
+
     REDIS_SERVER: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
     REDIS_CACHED_DAYS: int = 8
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 1.0
+    REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS: float = 1.0
+    REDIS_SLOW_CALL_MS: float = 50.0
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_BREAKER_RESET_SECONDS: float = 10.0
+    REDIS_GUARDED_CALL_TIMEOUT_SECONDS: float = 0.1
+    TOKEN_REVOCATION_CACHE_SECONDS: float = 5.0
+    TOKEN_REVOCATION_CACHE_SIZE: int = 10000
+    TOKEN_REVOCATION_FAIL_OPEN: bool = True
+
+    ENTITLEMENT_LOCAL_TTL_SECONDS: int = 30
+    ENTITLEMENT_LOCAL_CACHE_SIZE: int = 10000
+    ENTITLEMENT_CACHE_MAX_TTL_SECONDS: int = 60 * 60
+    ENTITLEMENT_NEGATIVE_TTL_SECONDS: int = 60
+
+    SYNC_PAGE_SIZE: int = 500
+    IMPORT_MEDIA_CONCURRENCY: int = 8
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    CATALOG_CACHE_TTL_SECONDS: float = 30.0
+    CATALOG_CACHE_STALE_SECONDS: float = 300.0
+    SINGLE_FLIGHT_LOCK_SECONDS: float = 10.0
+    CATALOG_SNAPSHOT_CHECK_SECONDS: float = 30.0
+    CATALOG_SNAPSHOT_MAX_AGE_SECONDS: float = 15 * 60
+    MAP_MAX_ZOOM: int = 18
+    MAP_CLUSTER_CELL_SHIFT: int = 2
+    MAP_MAX_VIEWPORT_TILES: int = 16  # Ширина и высота bbox в тайлах текущего зума
+    GEOFENCE_CELL_METERS: float = 500.0
+    GEOFENCE_MAX_ACCURACY_METERS: float = 100.0
+    GEOFENCE_DEDUPE_SECONDS: int = 24 * 60 * 60
+    MISSION_VISIT_SECONDS: int = 60 * 60
+    EVENTS_MAX_STREAMS: int = 20000
+    EVENTS_MAX_STREAMS_PER_USER: int = 5
+    EVENTS_QUEUE_SIZE: int = 32
+    EVENTS_HEARTBEAT_SECONDS: float = 25.0
+    EVENTS_TICKET_SECONDS: int = 30
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_SECONDS: float = 30.0
+    PROFILING_MAX_STACKS: int = 200
+
+    WARMUP_BUDGET_SECONDS: float = 20.0
+    WARMUP_REDIS_CONNECTIONS: int = 5
+    WARMUP_POPULAR_QUESTS: int = 50
+    WARMUP_POPULAR_QUESTS_TTL_SECONDS: int = 6 * 60 * 60
 
     class RedisDB(Enum):
         TOKEN_BLACK_LIST = 0
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Iterator
+
+from pydantic import ValidationError
+from sqlmodel import Session, SQLModel
+
+from app import crud
+from app.core.minio_handler import minio_client
+from app.models import (
+    ArtifactImport,
+    ArtifactPieceImport,
+    CityImport,
+    DialogueImport,
+    ImportReport,
+    MediaImport,
+    MissionImport,
+    QuestImport,
+)
+
+# Record kinds of a content package, mapped to their schema and target table.
+IMPORT_KINDS: dict[str, tuple[type[SQLModel], str]] = {
+    "city": (CityImport, "city"),
+    "artifact": (ArtifactImport, "artifact"),
+    "artifact_piece": (ArtifactPieceImport, "artifactpiece"),
+    "quest": (QuestImport, "quest"),
+    "mission": (MissionImport, "mission"),
+    "dialogue": (DialogueImport, "dialogue"),
+}
+MEDIA_KIND = "media"
+PACKAGE_NAMES = ("package.ndjson", "package.jsonl", "package.csv")
+MAX_REPORTED_ERRORS = 50
+
+
+class ContentImportError(Exception):
+    def __init__(self, errors: list[str]):
+        super().__init__(f"Content package is invalid: {len(errors)} error(s)")
+        self.errors = errors
+
+
+class ContentPackage:
+    """
+    A content package: a JSON Lines or CSV file of records with a `kind` field, either on
+    its own, next to its media files in a directory, or inside a zip archive with them.
+    """
+
+    def __init__(self, source: str | BinaryIO, filename: str | None = None):
+        self.filename = filename or (source if isinstance(source, str) else "package.ndjson")
+        self._source = source
+        self._zip: zipfile.ZipFile | None = None
+        self._base_dir: str | None = None
+        self._records_path: str | None = None
+
+        if isinstance(source, str) and os.path.isdir(source):
+            self._base_dir = source
+            self._records_path = next((os.path.join(source, name) for name in PACKAGE_NAMES
+                                       if os.path.exists(os.path.join(source, name))), None)
+        elif self.filename.endswith(".zip"):
+            self._zip = zipfile.ZipFile(source)
+        elif isinstance(source, str):
+            self._base_dir = os.path.dirname(source)
+            self._records_path = source
+
+    def _open_records(self) -> tuple[BinaryIO, str]:
+        if self._zip is not None:
+            name = next((name for name in PACKAGE_NAMES if name in self._zip.namelist()), None)
+            if name is None:
+                raise ContentImportError([f"Archive contains none of: {', '.join(PACKAGE_NAMES)}"])
+            return self._zip.open(name), name
+        if self._base_dir is not None:
+            if self._records_path is None:
+                raise ContentImportError([f"Directory contains none of: {', '.join(PACKAGE_NAMES)}"])
+            return open(self._records_path, "rb"), self._records_path
+        return self._source, self.filename
+
+    def records(self) -> Iterator[tuple[int, dict[str, Any]]]:
+        stream, name = self._open_records()
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8")
+        if name.endswith(".csv"):
+            for line, row in enumerate(csv.DictReader(text_stream), start=2):
+                yield line, {key: value for key, value in row.items() if value not in ("", None)}
+        else:
+            for line, raw in enumerate(text_stream, start=1):
+                if raw.strip():
+                    yield line, json.loads(raw)
+
+    def open_media(self, path: str) -> BinaryIO:
+        if self._zip is not None:
+            return io.BytesIO(self._zip.read(path))
+        if self._base_dir is None:
+            raise ContentImportError([f"Media file '{path}' cannot be resolved without an archive"])
+        return open(os.path.join(self._base_dir, path), "rb")
+
+
+def validate_package(package: ContentPackage) -> tuple[dict[str, Any], list[MediaImport], dict[str, int]]:
+    """
+    Validates every record in one streaming pass and spools the valid rows per table to
+    temporary files, so memory use does not depend on the package size.
+    """
+    spools: dict[str, Any] = {}
+    counts = {table: 0 for _, table in IMPORT_KINDS.values()}
+    media: list[MediaImport] = []
+    errors: list[str] = []
+
+    try:
+        for line, record in package.records():
+            kind = record.pop("kind", None)
+            try:
+                if kind == MEDIA_KIND:
+                    media.append(MediaImport.model_validate(record))
+                    continue
+                if kind not in IMPORT_KINDS:
+                    raise ValueError(f"unknown kind '{kind}'")
+                schema, table = IMPORT_KINDS[kind]
+                row = schema.model_validate(record)
+            except (ValidationError, ValueError) as e:
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f"line {line}: {e}")
+                continue
+
+            if errors:
+                continue
+            spool = spools.get(table)
+            if spool is None:
+                spool = spools[table] = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+            columns = crud.IMPORT_TABLES[table]
+            data = row.model_dump()
+            spool.write(json.dumps([data[column] for column in columns]) + "\n")
+            counts[table] += 1
+    except json.JSONDecodeError as e:
+        errors.append(f"malformed JSON: {e}")
+
+    if errors:
+        for spool in spools.values():
+            spool.close()
+        raise ContentImportError(errors)
+    return spools, media, counts
+
+
+def upload_media(package: ContentPackage, media: list[MediaImport], concurrency: int) -> int:
+    def upload(item: MediaImport):
+        with package.open_media(item.path) as source:
+            minio_client.upload_file(item.bucket, item.object_name, source, content_type=item.content_type)
+
+    for bucket in {item.bucket for item in media}:
+        minio_client.create_bucket(bucket)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(upload, media))
+    return len(media)
+
+
+def _spooled_rows(spool) -> Iterator[tuple]:
+    spool.seek(0)
+    for line in spool:
+        yield tuple(json.loads(line))
+
+
+def import_content(session: Session, package: ContentPackage, media_concurrency: int = 8) -> ImportReport:
+    """
+    Validates a package, uploads its media and loads its records with COPY into staging
+    tables that are merged into the catalog in a single transaction.
+
+    The caller is expected to publish a catalog change afterwards.
+    """
+    spools, media, counts = validate_package(package)
+    try:
+        uploaded = upload_media(package, media, media_concurrency) if media else 0
+
+        for table in crud.IMPORT_TABLES:
+            if table not in spools:
+                continue
+            crud.create_staging_table(session, table)
+            crud.copy_into_staging(session, table, _spooled_rows(spools[table]))
+            crud.merge_staging_table(session, table)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+    logging.info(f"Content package '{package.filename}' imported: {counts}, {uploaded} media files.")
+    return ImportReport(counts=counts, media_uploaded=uploaded)
@@ -1,7 +1,10 @@
 from sqlmodel import create_engine, SQLModel
-from sqlalchemy import inspect
+from sqlalchemy import inspect, text
 import logging
 from app.core.config import settings
+from app.core.catalog_sync import catalog_sync_ddl
+from app.core.partitioning import progress_partition_ddl
+from app.core.search_index import search_index_ddl
 
 try:
     engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
@@ -11,6 +14,9 @@ try:
     if not inspector.has_table("user"):
         logging.info("Table 'user' does not exist. Creating all tables.")
         SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            for statement in progress_partition_ddl() + catalog_sync_ddl() + search_index_ddl():
+                connection.execute(text(statement))
     else:
         logging.info("Table 'user' already exists. Skipping table creation.")
 except Exception as e:
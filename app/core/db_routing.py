@@ -0,0 +1,100 @@
+import itertools
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import Engine, text
+from sqlmodel import create_engine
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.redis import RedisClient
+
+PIN_KEY_PREFIX = "db:primary-pin"
+
+# Zero when the replica has replayed everything it received, otherwise the age of the
+# last replayed transaction.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for read-only work: a healthy replica in round-robin order, or the
+    primary when no replica is healthy or the user is inside their read-your-writes window.
+
+    Replica lag is checked in a background thread at most once per check interval, so
+    the request path never waits for a health check.
+    """
+
+    def __init__(self, primary: Engine, replicas: list[Engine], max_lag: float, check_interval: float,
+                 pin_seconds: int):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.pin_seconds = pin_seconds
+        self._healthy: list[Engine] = []
+        self._round_robin = itertools.cycle(range(max(len(replicas), 1)))
+        self._checked_at = 0.0
+        self._check_lock = threading.Lock()
+
+    def _replica_is_healthy(self, replica: Engine) -> bool:
+        try:
+            with replica.connect() as connection:
+                lag = connection.execute(REPLICA_LAG_QUERY).scalar()
+        except Exception as e:
+            logging.warning(f"Replica {replica.url.host} is unreachable: {e}")
+            return False
+        if lag is None or lag > self.max_lag:
+            logging.warning(f"Replica {replica.url.host} lags by {lag} seconds, routing reads elsewhere.")
+            return False
+        return True
+
+    def _check_replicas(self):
+        try:
+            self._healthy = [replica for replica in self.replicas if self._replica_is_healthy(replica)]
+        finally:
+            self._checked_at = time.monotonic()
+            self._check_lock.release()
+
+    def _schedule_check(self):
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        if self._check_lock.acquire(blocking=False):
+            threading.Thread(target=self._check_replicas, name="replica-health-check", daemon=True).start()
+
+    def get_read_engine(self) -> Engine:
+        if not self.replicas:
+            return self.primary
+        self._schedule_check()
+        healthy = self._healthy
+        if not healthy:
+            return self.primary
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    async def pin_to_primary(self, redis: RedisClient, user_id: int):
+        """
+        Routes the user's reads to the primary until replicas have caught up with their write.
+        """
+        if self.replicas:
+            await redis.setex(f"{PIN_KEY_PREFIX}:{user_id}", timedelta(seconds=self.pin_seconds), "1")
+
+    async def is_pinned(self, redis: RedisClient, user_id: int) -> bool:
+        if not self.replicas:
+            return False
+        return bool(await redis.get(f"{PIN_KEY_PREFIX}:{user_id}"))
+
+
+replica_router = ReplicaRouter(
+    primary=engine,
+    replicas=[create_engine(str(uri), pool_pre_ping=True) for uri in settings.SQLALCHEMY_REPLICA_URIS],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS,
+    pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.config import settings
+from app.core.redis import RedisClient, redis_manager
+from app.models import Payment, Subscription
+
+KEY_PREFIX = "entitlement"
+INVALIDATION_CHANNEL = "entitlements:invalidate"
+
+
+@dataclass(frozen=True)
+class Entitlement:
+    plan_id: int | None = None
+    plan_name: str | None = None
+    expires_at: datetime | None = None
+
+    def is_active(self) -> bool:
+        return self.expires_at is not None and datetime.utcnow() <= self.expires_at
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "plan_id": self.plan_id,
+            "plan_name": self.plan_name,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        })
+
+    @classmethod
+    def loads(cls, value: str) -> "Entitlement":
+        data = json.loads(value)
+        expires_at = data["expires_at"]
+        return cls(
+            plan_id=data["plan_id"],
+            plan_name=data["plan_name"],
+            expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+        )
+
+
+def entitlement_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _ttl_seconds(entitlement: Entitlement, max_ttl: int, negative_ttl: int) -> int:
+    """
+    Entries never outlive the subscription they describe; users without one are cached
+    only briefly, so a purchase shows up quickly even if an invalidation is lost.
+    """
+    if entitlement.expires_at is None:
+        return min(negative_ttl, max_ttl)
+    remaining = (entitlement.expires_at - datetime.utcnow()).total_seconds()
+    return max(1, min(int(remaining), max_ttl))
+
+
+class EntitlementCache:
+    """
+    Two-level cache of each user's active plan: a short-lived in-process map in front of Redis.
+    Invalidations delete the Redis entries and are broadcast over pub/sub, so every worker
+    drops its in-process entries too.
+    """
+
+    def __init__(self, local_ttl: int, max_ttl: int, negative_ttl: int, local_size: int):
+        self.local_ttl = local_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.local_size = local_size
+        self._local: OrderedDict[int, tuple[Entitlement, float]] = OrderedDict()
+        self._listener: asyncio.Task | None = None
+
+    def _get_local(self, user_id: int) -> Entitlement | None:
+        cached = self._local.get(user_id)
+        if cached is None:
+            return None
+        entitlement, expires = cached
+        if time.monotonic() >= expires:
+            self._local.pop(user_id, None)
+            return None
+        return entitlement
+
+    def _set_local(self, user_id: int, entitlement: Entitlement):
+        ttl = _ttl_seconds(entitlement, self.local_ttl, self.negative_ttl)
+        self._local[user_id] = (entitlement, time.monotonic() + ttl)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+    async def get(self, session: Session, redis: RedisClient, user_id: int) -> Entitlement:
+        entitlement = self._get_local(user_id)
+        if entitlement is not None:
+            return entitlement
+
+        cached = await redis.get(entitlement_key(user_id))
+        if cached:
+            entitlement = Entitlement.loads(cached)
+        else:
+            entitlement = await run_in_threadpool(self._load, session, user_id)
+            ttl = _ttl_seconds(entitlement, self.max_ttl, self.negative_ttl)
+            await redis.setex(entitlement_key(user_id), timedelta(seconds=ttl), entitlement.dumps())
+
+        self._set_local(user_id, entitlement)
+        return entitlement
+
+    @staticmethod
+    def _load(session: Session, user_id: int) -> Entitlement:
+        result = crud.get_active_subscription(session, user_id=user_id, now=datetime.utcnow())
+        if result is None:
+            return Entitlement()
+        subscription, plan = result
+        return Entitlement(plan_id=plan.id, plan_name=plan.name, expires_at=subscription.end_date)
+
+    async def invalidate(self, redis: RedisClient, *user_ids: int):
+        """
+        Must be called after payment or subscription changes of the given users that are
+        not made through ORM objects (those are invalidated on commit).
+        """
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+        await redis.delete(*(entitlement_key(user_id) for user_id in user_ids))
+        await redis.publish(INVALIDATION_CHANNEL, ",".join(map(str, user_ids)))
+
+    def invalidate_sync(self, *user_ids: int):
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+        redis = redis_manager.get_sync_connection(settings.RedisDB.REDIS_CONTENT.value)
+        redis.delete(*(entitlement_key(user_id) for user_id in user_ids))
+        redis.publish(INVALIDATION_CHANNEL, ",".join(map(str, user_ids)))
+
+    def _drop_local(self, payload: bytes):
+        for user_id in payload.split(b","):
+            self._local.pop(int(user_id), None)
+
+    async def _listen(self):
+        redis = redis_manager.get_connection(settings.RedisDB.REDIS_CONTENT.value)
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        self._drop_local(message["data"])
+                    except ValueError as e:
+                        logging.warning(f"Dropping malformed entitlement invalidation {message['data']!r}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries missed meanwhile still expire after local_ttl.
+                logging.error(f"Entitlement invalidation listener failed, resubscribing: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start_listener(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+entitlement_cache = EntitlementCache(
+    local_ttl=settings.ENTITLEMENT_LOCAL_TTL_SECONDS,
+    max_ttl=settings.ENTITLEMENT_CACHE_MAX_TTL_SECONDS,
+    negative_ttl=settings.ENTITLEMENT_NEGATIVE_TTL_SECONDS,
+    local_size=settings.ENTITLEMENT_LOCAL_CACHE_SIZE,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_entitlement_changes(session, flush_context):
+    user_ids = {
+        instance.user_id for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, (Subscription, Payment))
+    }
+    if user_ids:
+        session.info.setdefault("entitlement_user_ids", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_entitlement_changes(session):
+    user_ids = session.info.pop("entitlement_user_ids", None)
+    if user_ids:
+        try:
+            entitlement_cache.invalidate_sync(*user_ids)
+        except Exception as e:
+            logging.error(f"Failed to invalidate entitlements of users {sorted(user_ids)}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_entitlement_changes(session):
+    session.info.pop("entitlement_user_ids", None)
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import secrets
+from collections import defaultdict
+from datetime import timedelta
+from typing import AsyncIterator
+
+import orjson
+
+from app.core.catalog import CATALOG_INVALIDATION_CHANNEL
+from app.core.config import settings
+from app.core.redis import RedisClient, redis_manager
+from app.models import EventTypeEnum
+
+USER_EVENTS_CHANNEL = "events:user"
+STREAM_TICKET_KEY_PREFIX = "events:ticket"
+
+
+async def publish_user_event(redis: RedisClient, user_id: int, event_type: EventTypeEnum, data: dict):
+    """
+    Sends an event to every open event stream of the user, on whichever worker it is.
+    """
+    message = {"user_id": user_id, "type": event_type.value, "data": data}
+    await redis.publish(USER_EVENTS_CHANNEL, orjson.dumps(message).decode())
+
+
+def format_sse(event_type: str, data: dict) -> bytes:
+    return b"event: " + event_type.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def issue_stream_ticket(redis: RedisClient, user_id: int, ttl: int) -> str:
+    """
+    Single-use ticket that opens one event stream, so that clients which cannot set
+    headers never have to put their bearer token in a URL.
+    """
+    ticket = secrets.token_urlsafe(32)
+    await redis.setex(f"{STREAM_TICKET_KEY_PREFIX}:{ticket}", timedelta(seconds=ttl), user_id)
+    return ticket
+
+
+async def redeem_stream_ticket(redis: RedisClient, ticket: str) -> int | None:
+    user_id = await redis.getdel(f"{STREAM_TICKET_KEY_PREFIX}:{ticket}")
+    return None if user_id is None else int(user_id)
+
+
+class TooManyStreams(Exception):
+    pass
+
+
+class Subscriber:
+    """
+    One open event stream. Its queue is bounded: a client that stops reading is
+    disconnected once the queue is full instead of buffering events without limit.
+    """
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, event: bytes):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventHub:
+    """
+    Fans events out to the streams open in this worker. The worker holds a single Redis
+    pub/sub connection for all of them, so idle streams cost a task and a small queue each.
+    """
+
+    def __init__(self, max_streams: int, max_streams_per_user: int, queue_size: int, heartbeat_seconds: float):
+        self.max_streams = max_streams
+        self.max_streams_per_user = max_streams_per_user
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.subscribers: dict[int, set[Subscriber]] = defaultdict(set)
+        self.stream_count = 0
+        self._listener: asyncio.Task | None = None
+
+    def check_capacity(self, user_id: int):
+        if self.stream_count >= self.max_streams:
+            raise TooManyStreams("Too many open event streams on this server")
+        if len(self.subscribers.get(user_id, ())) >= self.max_streams_per_user:
+            raise TooManyStreams("Too many open event streams for this user")
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        self.check_capacity(user_id)
+        subscriber = Subscriber(user_id, self.queue_size)
+        self.subscribers[user_id].add(subscriber)
+        self.stream_count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        streams = self.subscribers.get(subscriber.user_id)
+        if streams and subscriber in streams:
+            streams.discard(subscriber)
+            self.stream_count -= 1
+            if not streams:
+                del self.subscribers[subscriber.user_id]
+
+    def dispatch(self, channel: str, payload: bytes):
+        if channel == CATALOG_INVALIDATION_CHANNEL:
+            event = format_sse(EventTypeEnum.catalog.value, {"version": int(payload)})
+            for streams in self.subscribers.values():
+                for subscriber in streams:
+                    subscriber.offer(event)
+            return
+
+        message = orjson.loads(payload)
+        streams = self.subscribers.get(message["user_id"])
+        if streams:
+            event = format_sse(message["type"], message["data"])
+            for subscriber in streams:
+                subscriber.offer(event)
+
+    async def stream(self, user_id: int) -> AsyncIterator[bytes]:
+        """
+        Body of an SSE response: events as they arrive and a comment line as heartbeat
+        whenever the stream has been idle for `heartbeat_seconds`.
+
+        The subscription is made by the generator itself, so a response that is cancelled
+        before it starts iterating never leaves a subscriber behind.
+        """
+        try:
+            subscriber = self.subscribe(user_id)
+        except TooManyStreams as e:
+            logging.info(f"Event stream of user {user_id} refused: {e}")
+            return
+        try:
+            yield b"retry: 5000\n\n"
+            while not subscriber.overflowed:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": heartbeat\n\n"
+            logging.info(f"Event stream of user {subscriber.user_id} fell behind, closing it.")
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def _listen(self):
+        redis = redis_manager.get_connection(settings.RedisDB.REDIS_CONTENT.value)
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(USER_EVENTS_CHANNEL, CATALOG_INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        self.dispatch(message["channel"].decode(), message["data"])
+                    except (ValueError, KeyError) as e:
+                        logging.warning(f"Dropping malformed event {message['data']!r}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Event listener failed, resubscribing: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start_listener(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+event_hub = EventHub(
+    max_streams=settings.EVENTS_MAX_STREAMS,
+    max_streams_per_user=settings.EVENTS_MAX_STREAMS_PER_USER,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    heartbeat_seconds=settings.EVENTS_HEARTBEAT_SECONDS,
+)
@@ -0,0 +1,91 @@
+import csv
+import io
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Iterator
+
+import orjson
+from sqlmodel import Session
+
+from app import crud
+from app.core.db_routing import replica_router
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(columns: list[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    for row in rows:
+        yield orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_APPEND_NEWLINE)
+
+
+def encode_csv(columns: list[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+}
+
+
+def chunked(lines: Iterable[bytes], chunk_bytes: int) -> Iterator[bytes]:
+    """
+    Joins encoded rows into chunks of about `chunk_bytes`, so the response is not
+    written one row at a time.
+    """
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(entity: str, export_format: str, compress: bool, batch_size: int,
+                  chunk_bytes: int) -> Iterator[bytes]:
+    """
+    Generates the export body of a table. The generator opens its own session because it
+    runs after the request's dependencies have been closed; the session lives until the
+    last chunk is sent or the client disconnects.
+    """
+    columns = crud.get_export_columns(entity)
+    with Session(replica_router.get_read_engine()) as session:
+        rows = crud.stream_export_rows(session, entity, batch_size)
+        chunks = chunked(ENCODERS[export_format](columns, rows), chunk_bytes)
+        yield from gzipped(chunks) if compress else chunks
@@ -0,0 +1,117 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from app.core.redis import RedisClient
+from app.models import GeofenceTrigger, LocationPing
+
+EARTH_RADIUS_METERS = 6_371_000
+METERS_PER_DEGREE = 111_320
+TRIGGERED_KEY_PREFIX = "geofence:triggered"
+VISIT_KEY_PREFIX = "geofence:visit"
+
+
+def haversine_meters(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+@dataclass(frozen=True)
+class Geofence:
+    entity: str
+    id: int
+    latitude: float
+    longitude: float
+    radius: float
+
+
+@dataclass
+class GeofenceIndex:
+    """
+    Uniform grid of `cell_meters`-sized cells (in degrees of latitude, also used for
+    longitude). Every geofence is registered in all cells its bounding box touches, so a
+    ping only has to be checked against the geofences of its own cell.
+    """
+    cell_meters: float
+    cells: dict[tuple[int, int], list[Geofence]] = field(default_factory=lambda: defaultdict(list))
+
+    @property
+    def cell_degrees(self) -> float:
+        return self.cell_meters / METERS_PER_DEGREE
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def add(self, geofence: Geofence):
+        latitude_delta = geofence.radius / METERS_PER_DEGREE
+        longitude_delta = geofence.radius / (METERS_PER_DEGREE * max(math.cos(math.radians(geofence.latitude)), 1e-6))
+        min_row, min_column = self._cell(geofence.latitude - latitude_delta, geofence.longitude - longitude_delta)
+        max_row, max_column = self._cell(geofence.latitude + latitude_delta, geofence.longitude + longitude_delta)
+        for row in range(min_row, max_row + 1):
+            for column in range(min_column, max_column + 1):
+                self.cells[(row, column)].append(geofence)
+
+    @classmethod
+    def build(cls, geofences: list[Geofence], cell_meters: float) -> "GeofenceIndex":
+        index = cls(cell_meters=cell_meters)
+        for geofence in geofences:
+            index.add(geofence)
+        return index
+
+    def match(self, latitude: float, longitude: float) -> list[Geofence]:
+        return [
+            geofence for geofence in self.cells.get(self._cell(latitude, longitude), ())
+            if haversine_meters(latitude, longitude, geofence.latitude, geofence.longitude) <= geofence.radius
+        ]
+
+    def match_pings(self, pings: list[LocationPing], max_accuracy: float) -> dict[Geofence, LocationPing]:
+        """
+        Returns every geofence entered by the pings with the first ping inside it. Pings less
+        accurate than `max_accuracy` meters are ignored.
+        """
+        matched: dict[Geofence, LocationPing] = {}
+        for ping in pings:
+            if ping.accuracy is not None and ping.accuracy > max_accuracy:
+                continue
+            for geofence in self.match(ping.latitude, ping.longitude):
+                matched.setdefault(geofence, ping)
+        return matched
+
+
+async def suppress_duplicates(redis: RedisClient, user_id: int, triggers: list[GeofenceTrigger],
+                              ttl: timedelta) -> list[GeofenceTrigger]:
+    """
+    Keeps the triggers the user has not received within `ttl`. Every (user, geofence)
+    pair has its own key, set only if absent, so each trigger expires `ttl` after it was
+    first sent regardless of later check-ins.
+    """
+    if not triggers:
+        return []
+    batch = redis.pipeline(transaction=False)
+    for trigger in triggers:
+        batch.set(f"{TRIGGERED_KEY_PREFIX}:{user_id}:{trigger.entity.value}:{trigger.id}", "1",
+                  expiration=ttl, nx=True)
+    added = await batch.execute()
+    return [trigger for trigger, is_new in zip(triggers, added) if is_new]
+
+
+def mission_visit_key(user_id: int, mission_id: int) -> str:
+    return f"{VISIT_KEY_PREFIX}:{user_id}:missions:{mission_id}"
+
+
+async def record_mission_visits(redis: RedisClient, user_id: int, mission_ids: list[int], ttl: timedelta):
+    """
+    Remembers that a check-in put the user inside the missions' geofences; completing
+    such a mission requires a visit recorded within `ttl`.
+    """
+    if not mission_ids:
+        return
+    await redis.mset({mission_visit_key(user_id, mission_id): "1" for mission_id in mission_ids}, expiration=ttl)
+
+
+async def has_visited_mission(redis: RedisClient, user_id: int, mission_id: int) -> bool:
+    return bool(await redis.get(mission_visit_key(user_id, mission_id)))
@@ -0,0 +1,47 @@
+import orjson
+from sqlmodel import Session
+
+from app import crud
+from app.core.minio_handler import minio_client
+from app.models import CityWithProgress
+
+
+def get_cities_with_progress(session: Session, user_id: int) -> list[CityWithProgress]:
+    progress = crud.get_city_quest_progress(session, user_id)
+    cities = []
+    for city in crud.get_all_cities(session):
+        total, completed = progress.get(city.id, (0, 0))
+        cities.append(CityWithProgress(
+            id=city.id,
+            name=city.title,
+            description=city.description,
+            picture_small_url=minio_client.get_object_url("cities-bucket", city.picture_small_url),
+            latitude=city.latitude,
+            longitude=city.longitude,
+            progress=completed / total * 100 if total else 0,
+        ))
+    return cities
+
+
+def parse_if_none_match(header: str | None) -> set[str]:
+    """
+    Entity tags of an If-None-Match header; weak tags compare equal to strong ones.
+    """
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+def encode_sections(sections: list[tuple[str, str, bytes]], known_etags: set[str]) -> bytes:
+    """
+    Assembles the HomePublic body from (name, etag, encoded body) without decoding the
+    bodies again. Sections whose etag the client already has are sent without data.
+    """
+    parts = []
+    for name, etag, body in sections:
+        if etag in known_etags:
+            section = b'{"etag":' + orjson.dumps(etag) + b',"not_modified":true,"data":null}'
+        else:
+            section = b'{"etag":' + orjson.dumps(etag) + b',"not_modified":false,"data":' + body + b"}"
+        parts.append(orjson.dumps(name) + b":" + section)
+    return b'{"sections":{' + b",".join(parts) + b"}}"
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.redis import RedisClient
+from app.models import ArtifactProgress
+
+INVENTORY_KEY_PREFIX = "inventory"
+
+# Redis numbers bits from the most significant bit of each byte; reversing the bits of
+# every byte lets the whole bitset be read as one little-endian int with bit n = piece n.
+BIT_REVERSE = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
+
+def inventory_key(user_id: int) -> str:
+    return f"{INVENTORY_KEY_PREFIX}:{user_id}"
+
+
+def bitset_to_int(raw: bytes) -> int:
+    return int.from_bytes(raw.translate(BIT_REVERSE), "little")
+
+
+@dataclass(frozen=True)
+class ArtifactMask:
+    id: int
+    name: str
+    piece_ids: tuple[int, ...]
+    mask: int
+
+    def progress(self, inventory: int) -> ArtifactProgress:
+        collected = inventory & self.mask
+        return ArtifactProgress(
+            id=self.id,
+            name=self.name,
+            total_pieces=len(self.piece_ids),
+            collected_pieces=collected.bit_count(),
+            collected_piece_ids=[piece_id for piece_id in self.piece_ids if collected >> piece_id & 1],
+            complete=collected == self.mask,
+        )
+
+
+def build_artifact_masks(rows: Iterable[tuple[int, str, int]]) -> dict[int, ArtifactMask]:
+    """
+    Precomputes the piece mask of every artifact from (artifact_id, name, piece_id) rows.
+    """
+    pieces: dict[int, tuple[str, list[int]]] = {}
+    for artifact_id, name, piece_id in rows:
+        pieces.setdefault(artifact_id, (name, []))[1].append(piece_id)
+    return {
+        artifact_id: ArtifactMask(
+            id=artifact_id,
+            name=name,
+            piece_ids=tuple(piece_ids),
+            mask=sum(1 << piece_id for piece_id in set(piece_ids)),
+        )
+        for artifact_id, (name, piece_ids) in pieces.items()
+    }
+
+
+async def load_inventory(redis: RedisClient, session: Session, user_id: int) -> int:
+    """
+    Reads the user's bitset (a `bytes` codec client is expected). A missing key, e.g.
+    for a new user or after Redis lost data, is rebuilt from completed missions; bit 0 is
+    always written so that an empty inventory still has a key.
+    """
+    raw = await redis.get(inventory_key(user_id))
+    if raw is not None:
+        return bitset_to_int(raw)
+
+    piece_ids = await run_in_threadpool(crud.get_collected_piece_ids, session, user_id)
+    batch = redis.pipeline(transaction=False)
+    batch.setbit(inventory_key(user_id), 0, 0)
+    for piece_id in piece_ids:
+        batch.setbit(inventory_key(user_id), piece_id, 1)
+    await batch.execute()
+    return sum(1 << piece_id for piece_id in piece_ids)
+
+
+async def collect_piece(redis: RedisClient, user_id: int, piece_id: int) -> bool:
+    """
+    Atomically adds the piece to the inventory; returns False if the user already had it.
+    """
+    return not await redis.setbit(inventory_key(user_id), piece_id, 1)
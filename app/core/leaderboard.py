@@ -0,0 +1,109 @@
+from typing import AsyncIterable
+
+import logging
+
+from app.core.redis import RedisClient
+from app.models import LeaderboardEntry, LeaderboardMetricEnum
+
+KEY_PREFIX = "leaderboard"
+REBUILD_SUFFIX = "rebuild"
+
+
+def leaderboard_key(metric: LeaderboardMetricEnum, city_id: int | None = None) -> str:
+    if city_id is None:
+        return f"{KEY_PREFIX}:{metric.value}:global"
+    return f"{KEY_PREFIX}:{metric.value}:city:{city_id}"
+
+
+async def increment_score(redis: RedisClient, metric: LeaderboardMetricEnum, user_id: int, city_id: int,
+                          amount: int = 1):
+    """
+    Incrementally updates the global and the per-city leaderboard on a progress event.
+    """
+    pipe = redis.pipeline(transaction=False)
+    pipe.zincrby(leaderboard_key(metric), amount, str(user_id))
+    pipe.zincrby(leaderboard_key(metric, city_id), amount, str(user_id))
+    await pipe.execute()
+
+
+async def record_quest_completed(redis: RedisClient, user_id: int, city_id: int):
+    await increment_score(redis, LeaderboardMetricEnum.quests, user_id, city_id)
+
+
+async def record_artifact_piece_collected(redis: RedisClient, user_id: int, city_id: int):
+    await increment_score(redis, LeaderboardMetricEnum.artifacts, user_id, city_id)
+
+
+async def get_top(redis: RedisClient, metric: LeaderboardMetricEnum, city_id: int | None = None,
+                  offset: int = 0, limit: int = 50) -> tuple[list[LeaderboardEntry], int]:
+    key = leaderboard_key(metric, city_id)
+    pipe = redis.pipeline(transaction=False)
+    pipe.zrevrange(key, offset, offset + limit - 1, withscores=True)
+    pipe.zcard(key)
+    members, count = await pipe.execute()
+
+    entries = [
+        LeaderboardEntry(user_id=int(member), score=int(score), rank=offset + position + 1)
+        for position, (member, score) in enumerate(members)
+    ]
+    return entries, count
+
+
+async def get_user_rank(redis: RedisClient, metric: LeaderboardMetricEnum, user_id: int,
+                        city_id: int | None = None) -> LeaderboardEntry | None:
+    key = leaderboard_key(metric, city_id)
+    pipe = redis.pipeline(transaction=False)
+    pipe.zrevrank(key, str(user_id))
+    pipe.zscore(key, str(user_id))
+    rank, score = await pipe.execute()
+    if rank is None:
+        return None
+    return LeaderboardEntry(user_id=user_id, score=int(score), rank=rank + 1)
+
+
+async def rebuild_leaderboard(redis: RedisClient, metric: LeaderboardMetricEnum,
+                              rows: AsyncIterable[tuple[int, int, int]], batch_size: int = 1000) -> int:
+    """
+    Recomputes the leaderboards of a metric from (user_id, city_id, score) rows.
+
+    Scores are written into temporary keys in pipelined batches and swapped in
+    atomically at the end, so readers never see a half-built leaderboard.
+    """
+    global_key = f"{leaderboard_key(metric)}:{REBUILD_SUFFIX}"
+    await redis.delete(global_key)
+
+    city_ids: set[int] = set()
+    pipe = redis.pipeline(transaction=False)
+    processed = 0
+    async for user_id, city_id, score in rows:
+        city_key = f"{leaderboard_key(metric, city_id)}:{REBUILD_SUFFIX}"
+        if city_id not in city_ids:
+            city_ids.add(city_id)
+            pipe.delete(city_key)
+        pipe.zincrby(global_key, score, str(user_id))
+        pipe.zadd(city_key, {str(user_id): score})
+        processed += 1
+        if processed % batch_size == 0:
+            await pipe.execute()
+    await pipe.execute()
+
+    stale_keys = []
+    async for key in redis.scan_iter(match=f"{KEY_PREFIX}:{metric.value}:city:*"):
+        if key.endswith(f":{REBUILD_SUFFIX}"):
+            continue
+        if int(key.rsplit(":", 1)[1]) not in city_ids:
+            stale_keys.append(key)
+
+    swap = redis.pipeline(transaction=True)
+    if processed:
+        swap.rename(global_key, leaderboard_key(metric))
+    else:
+        swap.delete(leaderboard_key(metric))
+    for city_id in city_ids:
+        swap.rename(f"{leaderboard_key(metric, city_id)}:{REBUILD_SUFFIX}", leaderboard_key(metric, city_id))
+    for key in stale_keys:
+        swap.delete(key)
+    await swap.execute()
+
+    logging.info(f"Leaderboard '{metric.value}' rebuilt: {processed} rows, {len(city_ids)} cities.")
+    return processed
@@ -0,0 +1,42 @@
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI
+from loguru import logger
+
+Hook = Callable[[], Awaitable[None]]
+
+startup_hooks: list[Hook] = []
+shutdown_hooks: list[Hook] = []
+
+
+def on_startup(hook: Hook) -> Hook:
+    """
+    Registers a coroutine that runs once in every worker process before it serves requests.
+    """
+    startup_hooks.append(hook)
+    return hook
+
+
+def on_shutdown(hook: Hook) -> Hook:
+    """
+    Registers a coroutine that runs once in every worker process after it stopped serving.
+    Shutdown hooks run in reverse registration order.
+    """
+    shutdown_hooks.append(hook)
+    return hook
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for hook in startup_hooks:
+        await hook()
+    logger.info(f"Worker started, {len(startup_hooks)} startup hooks completed")
+    try:
+        yield
+    finally:
+        for hook in reversed(shutdown_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"Shutdown hook {hook.__name__} failed: {e}")
@@ -0,0 +1,119 @@
+import math
+from dataclasses import dataclass, field
+
+from app.models import MapCluster, MapMarker
+
+MAX_LATITUDE = 85.05112878  # Web Mercator cuts the map off at this latitude
+
+
+def _tile_x(longitude: float, cells: int) -> float:
+    return (longitude + 180.0) / 360.0 * cells
+
+
+def _tile_y(latitude: float, cells: int) -> float:
+    latitude = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude)))
+    return (1.0 - math.asinh(math.tan(latitude)) / math.pi) / 2.0 * cells
+
+
+def viewport_tiles(min_longitude: float, min_latitude: float, max_longitude: float, max_latitude: float,
+                   zoom: int) -> tuple[float, float]:
+    """
+    Width and height of a viewport in map tiles at the zoom level.
+    """
+    width = max_longitude - min_longitude
+    if width < 0:
+        # The viewport crosses the antimeridian.
+        width += 360.0
+    tiles = 2 ** zoom
+    return width / 360.0 * tiles, _tile_y(min_latitude, tiles) - _tile_y(max_latitude, tiles)
+
+
+@dataclass
+class _Cell:
+    representative: MapMarker
+    count: int = 0
+    latitude_sum: float = 0.0
+    longitude_sum: float = 0.0
+
+    def add(self, marker: MapMarker):
+        self.count += 1
+        self.latitude_sum += marker.latitude
+        self.longitude_sum += marker.longitude
+
+    def to_cluster(self) -> MapCluster:
+        return MapCluster(
+            latitude=self.latitude_sum / self.count,
+            longitude=self.longitude_sum / self.count,
+            count=self.count,
+            item=self.representative,
+        )
+
+
+@dataclass
+class MapClusterIndex:
+    """
+    Markers pre-aggregated into a Web Mercator grid for every zoom level. At zoom z a map
+    tile is split into 2**cell_shift x 2**cell_shift cells, so the number of clusters in a
+    viewport depends on the screen size, not on how many markers the catalog has.
+
+    The first marker added to a cell is its representative, so callers add the markers
+    they want to show first (cities before places) first.
+    """
+    max_zoom: int
+    cell_shift: int
+    grids: list[dict[tuple[int, int], _Cell]] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, markers: list[MapMarker], max_zoom: int, cell_shift: int) -> "MapClusterIndex":
+        index = cls(max_zoom=max_zoom, cell_shift=cell_shift)
+        for zoom in range(max_zoom + 1):
+            cells = index._cells(zoom)
+            grid: dict[tuple[int, int], _Cell] = {}
+            for marker in markers:
+                key = (
+                    min(int(_tile_x(marker.longitude, cells)), cells - 1),
+                    min(int(_tile_y(marker.latitude, cells)), cells - 1),
+                )
+                cell = grid.get(key)
+                if cell is None:
+                    cell = grid[key] = _Cell(representative=marker)
+                cell.add(marker)
+            index.grids.append(grid)
+        return index
+
+    def _cells(self, zoom: int) -> int:
+        return 2 ** (zoom + self.cell_shift)
+
+    def _x_ranges(self, min_longitude: float, max_longitude: float, cells: int) -> list[range]:
+        start = min(int(_tile_x(min_longitude, cells)), cells - 1)
+        end = min(int(_tile_x(max_longitude, cells)), cells - 1)
+        if min_longitude > max_longitude:
+            # The viewport crosses the antimeridian.
+            return [range(start, cells), range(0, end + 1)]
+        return [range(start, end + 1)]
+
+    def query(self, min_longitude: float, min_latitude: float, max_longitude: float, max_latitude: float,
+              zoom: int) -> list[MapCluster]:
+        zoom = max(0, min(zoom, self.max_zoom))
+        grid = self.grids[zoom]
+        cells = self._cells(zoom)
+        x_ranges = self._x_ranges(min_longitude, max_longitude, cells)
+        # Tile rows grow southwards.
+        y_range = range(
+            min(int(_tile_y(max_latitude, cells)), cells - 1),
+            min(int(_tile_y(min_latitude, cells)), cells - 1) + 1,
+        )
+
+        viewport_cells = sum(len(x_range) for x_range in x_ranges) * len(y_range)
+        if viewport_cells > len(grid):
+            found = [
+                cell for (x, y), cell in grid.items()
+                if y in y_range and any(x in x_range for x_range in x_ranges)
+            ]
+        else:
+            found = [
+                grid[(x, y)]
+                for x_range in x_ranges for x in x_range for y in y_range
+                if (x, y) in grid
+            ]
+        return [cell.to_cluster() for cell in found]
@@ -0,0 +1,111 @@
+# User progress tables, hash-partitioned by user_id, with the columns copied by the backfill.
+PARTITIONED_TABLES = {
+    "userachievement": ("id", "user_id", "achievement_id", "progress", "unit_of_measurement"),
+    "userquest": ("id", "user_id", "quest_id", "status"),
+    "usermission": ("id", "user_id", "mission_id", "status"),
+}
+
+# Changing the count requires re-partitioning, so it is part of the schema, not a setting.
+PROGRESS_PARTITIONS = 16
+
+SHADOW_SUFFIX = "partitioned"
+LEGACY_SUFFIX = "legacy"
+# Ids of rows written while the mirror triggers are active, filled by the triggers.
+CHANGE_LOG_TABLE = "progresspartitionchange"
+
+
+def partition_name(table: str, remainder: int) -> str:
+    return f"{table}_p{remainder}"
+
+
+def progress_partition_ddl() -> list[str]:
+    statements = []
+    for table in PARTITIONED_TABLES:
+        for remainder in range(PROGRESS_PARTITIONS):
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(table, remainder)} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {PROGRESS_PARTITIONS}, REMAINDER {remainder})"
+            )
+    return statements
+
+
+def shadow_table(table: str) -> str:
+    return f"{table}_{SHADOW_SUFFIX}"
+
+
+def backfill_batch_sql(table: str) -> str:
+    """
+    Copies the next `:batch_size` rows with id > `:after_id` from the legacy table into
+    its partitioned shadow and returns the last copied id and the number of rows read.
+    Rows already copied, by an earlier batch or by the mirror trigger, are skipped.
+    """
+    columns = ", ".join(PARTITIONED_TABLES[table])
+    return f"""
+        WITH batch AS (
+            SELECT {columns} FROM {table}
+            WHERE id > :after_id
+            ORDER BY id
+            LIMIT :batch_size
+        ), copied AS (
+            INSERT INTO {shadow_table(table)} ({columns})
+            SELECT {columns} FROM batch
+            ON CONFLICT DO NOTHING
+        )
+        SELECT max(id), count(*) FROM batch
+    """
+
+
+def _same_row(columns: tuple[str, ...], left: str, right: str) -> str:
+    return (f"ROW({', '.join(f'{left}.{column}' for column in columns)}) IS NOT DISTINCT FROM "
+            f"ROW({', '.join(f'{right}.{column}' for column in columns)})")
+
+
+def verify_batch_sql(table: str) -> list[str]:
+    """
+    Repairs the shadow rows with `:after_id` < id <= `:up_to_id` so they equal the live
+    table: rows that differ or no longer exist are deleted, then missing rows are copied.
+    Returns two statements; they must run separately, the second has to see the deletions.
+    """
+    columns = PARTITIONED_TABLES[table]
+    column_list = ", ".join(columns)
+    shadow = shadow_table(table)
+    return [
+        f"""
+        DELETE FROM {shadow} s
+        WHERE s.id > :after_id AND s.id <= :up_to_id
+          AND NOT EXISTS (SELECT 1 FROM {table} l WHERE l.id = s.id AND {_same_row(columns, "l", "s")})
+        """,
+        f"""
+        INSERT INTO {shadow} ({column_list})
+        SELECT {column_list} FROM {table} l
+        WHERE l.id > :after_id AND l.id <= :up_to_id
+          AND NOT EXISTS (SELECT 1 FROM {shadow} s WHERE s.id = l.id)
+        ON CONFLICT DO NOTHING
+        """,
+    ]
+
+
+def swap_sql(table: str) -> list[str]:
+    """
+    Statements that, with the live table locked against writes, re-copy the rows logged as
+    changed after the `:watermark` change id and put the partitioned shadow in place of the
+    live table. The live table stays as <table>_legacy.
+    """
+    columns = ", ".join(PARTITIONED_TABLES[table])
+    shadow, legacy = shadow_table(table), f"{table}_{LEGACY_SUFFIX}"
+    changed = (f"SELECT DISTINCT row_id FROM {CHANGE_LOG_TABLE} "
+               f"WHERE table_name = '{table}' AND id > :watermark")
+    return [
+        f"LOCK TABLE {table} IN EXCLUSIVE MODE",
+        f"DELETE FROM {shadow} WHERE id IN ({changed})",
+        f"INSERT INTO {shadow} ({columns}) SELECT {columns} FROM {table} "
+        f"WHERE id IN ({changed}) ON CONFLICT DO NOTHING",
+        f"DROP TRIGGER {table}_partition_mirror ON {table}",
+        f"DROP FUNCTION {table}_partition_mirror()",
+        f"ALTER TABLE {table} RENAME TO {legacy}",
+        f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey",
+        f"ALTER TABLE {legacy} ALTER COLUMN id DROP DEFAULT",
+        f"ALTER TABLE {shadow} RENAME TO {table}",
+        f"ALTER TABLE {table} RENAME CONSTRAINT {shadow}_pkey TO {table}_pkey",
+        f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id",
+    ]
@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import hmac
+import io
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.minio_handler import minio_client
+
+PROFILE_HEADER = b"x-debug-profile"
+PROFILE_BUCKET = "profiles-bucket"
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+_active_profile: ContextVar["RequestProfile | None"] = ContextVar("active_profile", default=None)
+# Set while a profile runs in this worker, so that the SQL listeners of all other queries
+# return after a global lookup, without reading the ContextVar.
+_profiling = False
+
+
+def sign_profile_token(expires_at: int) -> str:
+    """
+    Value for the X-Debug-Profile header that triggers profiling until `expires_at` (unix time).
+    """
+    signature = hmac.new(settings.SECRET_KEY.encode(), f"profile:{expires_at}".encode(), hashlib.sha256)
+    return f"{expires_at}.{signature.hexdigest()}"
+
+
+def verify_profile_token(token: str) -> bool:
+    expires_at = token.partition(".")[0]
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(sign_profile_token(int(expires_at)), token)
+
+
+class StackSampler:
+    """
+    Statistical profiler: a background thread reads the stacks of all other threads
+    every `interval` seconds and counts identical stacks. Threads blocked in waits and
+    selectors are skipped, so the counts show where busy threads spend their time.
+
+    Python offers no way to tell which request a thread is serving, so the counts are
+    worker-wide: requests served concurrently show up too. Each stack is rooted at the
+    name of its thread so the report can be narrowed to the threads the request used.
+    """
+
+    def __init__(self, interval: float, max_seconds: float):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    @staticmethod
+    def _format(frame) -> str | None:
+        if os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+            return None
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self.samples += 1
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = self._format(frame)
+                if stack is not None:
+                    self.stacks[f"{names.get(thread_id, thread_id)};{stack}"] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """
+        Signals the thread to stop; `join` waits for it, off the event loop.
+        """
+        self._stop.set()
+
+    def join(self):
+        self._thread.join()
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, reason: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = datetime.utcnow()
+        self.sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000, settings.PROFILING_MAX_SECONDS)
+        self.queries: list[dict] = []
+        # Threads known to have run the request: the event loop's and those that ran its SQL.
+        self.threads = {threading.current_thread().name}
+        self.status_code: int | None = None
+        self.duration_ms = 0.0
+        self.finished = False
+
+    def report(self) -> bytes:
+        return orjson.dumps({
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "status_code": self.status_code,
+            "duration_ms": self.duration_ms,
+            "sampling_interval_ms": settings.PROFILING_INTERVAL_MS,
+            "samples": self.sampler.samples,
+            "stacks_scope": "worker",
+            "request_threads": sorted(self.threads),
+            "stacks": [
+                {"stack": stack, "count": count}
+                for stack, count in self.sampler.stacks.most_common(settings.PROFILING_MAX_STACKS)
+            ],
+            "sql_total_ms": sum(query["duration_ms"] for query in self.queries),
+            "sql": self.queries,
+        }, option=orjson.OPT_INDENT_2)
+
+    def upload(self):
+        object_name = f"{self.started_at:%Y-%m-%d}/{self.id}.json"
+        minio_client.upload_file(PROFILE_BUCKET, object_name, io.BytesIO(self.report()),
+                                 content_type="application/json")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profiling and _active_profile.get() is not None:
+        conn.info.setdefault("profile_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not _profiling:
+        return
+    profile = _active_profile.get()
+    started = conn.info.get("profile_query_started")
+    if profile is None or not started:
+        return
+    started = started.pop()
+    profile.threads.add(threading.current_thread().name)
+    profile.queries.append({
+        "statement": statement,
+        "duration_ms": (time.perf_counter() - started) * 1000,
+        "rows": cursor.rowcount,
+    })
+
+
+# Registered once for the process (adding and removing listeners per request races with
+# queries on other threads); they return immediately while nothing is profiled.
+event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that carry a valid signed X-Debug-Profile header or fall into the
+    PROFILING_SAMPLE_RATE sample: stack samples and SQL timings of the request are
+    uploaded as a JSON report to MinIO and the response gets an X-Profile-Id header.
+
+    At most one request per worker is profiled at a time; other requests pass straight
+    through to the app. Streaming responses (no Content-Length, e.g. SSE and exports) are
+    not profiled: the profile is dropped when their response starts, so a long-lived
+    stream does not keep profiling blocked on the worker.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._bucket_ready = False
+
+    def _trigger(self, scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return "header" if verify_profile_token(value.decode("latin-1")) else None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        reason = self._trigger(scope)
+        if reason is None or not self._lock.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        global _profiling
+        profile = RequestProfile(scope["method"], scope["path"], reason)
+        started = time.perf_counter()
+
+        def finish(upload: bool):
+            global _profiling
+            if profile.finished:
+                return
+            profile.finished = True
+            profile.sampler.stop()
+            profile.duration_ms = (time.perf_counter() - started) * 1000
+            _profiling = False
+            self._lock.release()
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self._upload if upload else self._discard, profile)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if message["status"] not in (204, 304) and not any(
+                        name.lower() == b"content-length" for name, _ in headers):
+                    finish(upload=False)
+                elif not profile.finished:
+                    profile.status_code = message["status"]
+                    message["headers"] = [*headers, (b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = _active_profile.set(profile)
+        _profiling = True
+        profile.sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _active_profile.reset(token)
+            finish(upload=True)
+
+    @staticmethod
+    def _discard(profile: RequestProfile):
+        profile.sampler.join()
+
+    def _upload(self, profile: RequestProfile):
+        profile.sampler.join()
+        try:
+            if not self._bucket_ready:
+                minio_client.create_bucket(PROFILE_BUCKET)
+                self._bucket_ready = True
+            profile.upload()
+            logging.info(f"Profile {profile.id} of {profile.method} {profile.path} uploaded.")
+        except Exception as e:
+            logging.error(f"Failed to upload request profile {profile.id}: {e}")
@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import threading
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.db_routing import replica_router
+from app.core.minio_handler import minio_client
+from app.models import Dialogue, Mission, Quest, QuestBundlePublic
+
+BUNDLE_BUCKET = "quest-bundles-bucket"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_CONTENT_TYPE = "application/gzip"
+
+
+def compile_quest_bundle(quest: Quest, missions: list[tuple[Mission, list[Dialogue]]]) -> dict:
+    """
+    Compiles a quest into a self-contained document: missions, dialogues and the manifest
+    of every media asset they reference.
+    """
+    assets: dict[tuple[str, str], dict] = {}
+
+    def asset(bucket: str, object_name: str) -> str:
+        url = minio_client.get_object_url(bucket, object_name)
+        assets.setdefault((bucket, object_name), {"bucket": bucket, "object": object_name, "url": url})
+        return url
+
+    return {
+        "version": BUNDLE_FORMAT_VERSION,
+        "quest": {
+            "quest_id": quest.id,
+            "title": quest.title,
+            "description": quest.description,
+            "city_id": quest.city_id,
+        },
+        "missions": [
+            {
+                "mission_id": mission.id,
+                "name": mission.name,
+                "description": mission.description,
+                "mission_order": mission.mission_order,
+                "reward_artifact_piece_id": mission.reward_artifact_piece_id,
+                "dialogues": [
+                    {
+                        "character_name": d.character_name,
+                        "text": d.text,
+                        "order": d.order,
+                        "background_url": asset("backgrounds-bucket", d.background_url),
+                        "character_image_url": asset("characters-bucket", d.character_image_url),
+                    }
+                    for d in dialogues
+                ],
+            }
+            for mission, dialogues in missions
+        ],
+        "assets": sorted(assets.values(), key=lambda a: (a["bucket"], a["object"])),
+    }
+
+
+class QuestBundleStore:
+    """
+    Uploads content-hashed quest bundles to MinIO. A bundle is only uploaded when its
+    hash changes, i.e. when the quest, its missions or its dialogues changed.
+
+    Built bundles are kept per quest together with the catalog version they were built
+    at, so requests only compile a quest again after a catalog change. Builds of the same
+    quest are serialized by a per-quest lock; different quests upload concurrently.
+    """
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self._bucket_lock = threading.Lock()
+        self._bucket_ready = False
+        # quest id -> object name of its latest uploaded bundle
+        self._uploaded: dict[int, str] = {}
+        # quest id -> (catalog version, bundle)
+        self._bundles: dict[int, tuple[int, QuestBundlePublic]] = {}
+        self._locks: dict[int, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _quest_lock(self, quest_id: int) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(quest_id, threading.Lock())
+
+    def _ensure_bucket(self):
+        with self._bucket_lock:
+            if not self._bucket_ready:
+                minio_client.create_bucket(self.bucket)
+                self._bucket_ready = True
+
+    def _exists(self, quest_id: int, object_name: str) -> bool:
+        if self._uploaded.get(quest_id) == object_name:
+            return True
+        return bool(minio_client.list_files(self.bucket, prefix=object_name))
+
+    def publish(self, quest_id: int, payload: dict) -> QuestBundlePublic:
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        object_name = f"{quest_id}/{digest}.json.gz"
+        archive = gzip.compress(raw, mtime=0)
+
+        self._ensure_bucket()
+        with self._quest_lock(quest_id):
+            if not self._exists(quest_id, object_name):
+                minio_client.upload_file(self.bucket, object_name, io.BytesIO(archive),
+                                         content_type=BUNDLE_CONTENT_TYPE)
+                logging.info(f"Quest bundle '{object_name}' rebuilt ({len(archive)} bytes).")
+            self._uploaded[quest_id] = object_name
+
+        return QuestBundlePublic(
+            quest_id=quest_id,
+            hash=digest,
+            url=minio_client.get_object_url(self.bucket, object_name),
+            size=len(archive),
+        )
+
+    def build(self, session: Session, quest_id: int) -> QuestBundlePublic | None:
+        quest = crud.get_quest_by_id(session, quest_id)
+        if not quest:
+            return None
+        missions = crud.get_missions_with_dialogues(session, quest_id)
+        return self.publish(quest_id, compile_quest_bundle(quest, missions))
+
+    def get(self, quest_id: int, catalog_version: int) -> QuestBundlePublic | None:
+        """
+        The bundle of the quest at the given catalog version, built only on the first
+        request after a catalog change. Built from the primary, like the catalog snapshot:
+        a lagging replica would be cached under the new version.
+        """
+        cached = self._bundles.get(quest_id)
+        if cached is not None and cached[0] == catalog_version:
+            return cached[1]
+        with Session(replica_router.primary) as session:
+            bundle = self.build(session, quest_id)
+        if bundle is None:
+            self._bundles.pop(quest_id, None)
+        else:
+            self._bundles[quest_id] = (catalog_version, bundle)
+        return bundle
+
+
+quest_bundle_store = QuestBundleStore(bucket=BUNDLE_BUCKET)
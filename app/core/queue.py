@@ -0,0 +1,183 @@
+import asyncio
+import math
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import orjson
+import redis.asyncio as aioredis
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.redis import redis_manager
+
+JobFunc = Callable[[BaseModel], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class JobDefinition:
+    name: str
+    func: JobFunc
+    payload_model: type[BaseModel]
+    max_retries: int
+    backoff_seconds: float
+    max_backoff_seconds: float
+    timeout_seconds: float
+    result_ttl_seconds: int
+
+    def backoff(self, attempt: int) -> float:
+        return min(self.backoff_seconds * 2 ** (attempt - 1), self.max_backoff_seconds)
+
+
+class JobQueue:
+    """
+    Redis-backed job queue: a ready list, a sorted set of delayed jobs scored by due time,
+    and per-job status records that expire after the job's result TTL.
+
+    Jobs are taken with BRPOP, so a job held by a worker that crashes is lost.
+    """
+
+    def __init__(self, redis: aioredis.Redis, namespace: str = "jobs"):
+        self.redis = redis
+        self.namespace = namespace
+        self.definitions: dict[str, JobDefinition] = {}
+
+    @property
+    def ready_key(self) -> str:
+        return f"{self.namespace}:ready"
+
+    @property
+    def delayed_key(self) -> str:
+        return f"{self.namespace}:delayed"
+
+    def status_key(self, job_id: str) -> str:
+        return f"{self.namespace}:status:{job_id}"
+
+    def job(self, payload: type[BaseModel], name: str | None = None, retries: int = 3, backoff: float = 2.0,
+            max_backoff: float = 300.0, timeout: float = 60.0, result_ttl: int = 3600):
+        """
+        Registers `async def fn(payload) -> result` as a job. The result must be JSON-serializable.
+        """
+        def decorator(func: JobFunc) -> JobFunc:
+            definition = JobDefinition(
+                name=name or func.__name__,
+                func=func,
+                payload_model=payload,
+                max_retries=retries,
+                backoff_seconds=backoff,
+                max_backoff_seconds=max_backoff,
+                timeout_seconds=timeout,
+                result_ttl_seconds=result_ttl,
+            )
+            self.definitions[definition.name] = definition
+            func.job_name = definition.name
+            return func
+        return decorator
+
+    async def _set_status(self, definition: JobDefinition, job_id: str, status: str, attempt: int,
+                          result: Any = None, error: str | None = None, pending_seconds: float = 0):
+        """
+        The status is kept `result_ttl` after the job finishes: while it is pending, the
+        expiry also covers `pending_seconds`, the time until the job can next change it.
+        """
+        record = {"job_id": job_id, "name": definition.name, "status": status, "attempts": attempt,
+                  "result": result, "error": error}
+        await self.redis.set(self.status_key(job_id), orjson.dumps(record),
+                             ex=definition.result_ttl_seconds + math.ceil(pending_seconds))
+
+    async def _schedule(self, envelope: dict, delay: float):
+        raw = orjson.dumps(envelope)
+        if delay > 0:
+            await self.redis.zadd(self.delayed_key, {raw: time.time() + delay})
+        else:
+            await self.redis.lpush(self.ready_key, raw)
+
+    async def enqueue(self, job: str | JobFunc, payload: BaseModel | dict, delay: float = 0) -> str:
+        name = job if isinstance(job, str) else job.job_name
+        definition = self.definitions[name]
+        payload = definition.payload_model.model_validate(payload)
+
+        job_id = uuid.uuid4().hex
+        await self._set_status(definition, job_id, "queued", attempt=0, pending_seconds=delay)
+        await self._schedule({"id": job_id, "name": name, "payload": payload.model_dump(mode="json"),
+                              "attempt": 0}, delay)
+        return job_id
+
+    async def get_status(self, job_id: str) -> dict | None:
+        raw = await self.redis.get(self.status_key(job_id))
+        return orjson.loads(raw) if raw else None
+
+    async def promote_due_jobs(self, limit: int = 100) -> int:
+        """
+        Moves delayed jobs whose time has come to the ready list. ZREM decides which
+        worker moves a job when several promote at once.
+        """
+        due = await self.redis.zrangebyscore(self.delayed_key, 0, time.time(), start=0, num=limit)
+        promoted = 0
+        for raw in due:
+            if await self.redis.zrem(self.delayed_key, raw):
+                await self.redis.lpush(self.ready_key, raw)
+                promoted += 1
+        return promoted
+
+    async def process(self, raw: bytes):
+        envelope = orjson.loads(raw)
+        definition = self.definitions.get(envelope["name"])
+        if definition is None:
+            logger.error(f"Dropping job {envelope['id']}: unknown job '{envelope['name']}'")
+            return
+
+        attempt = envelope["attempt"] + 1
+        await self._set_status(definition, envelope["id"], "running", attempt,
+                               pending_seconds=definition.timeout_seconds)
+        try:
+            payload = definition.payload_model.model_validate(envelope["payload"])
+            result = await asyncio.wait_for(definition.func(payload), timeout=definition.timeout_seconds)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt <= definition.max_retries:
+                delay = definition.backoff(attempt)
+                logger.warning(f"Job {definition.name} {envelope['id']} failed ({error}), retry in {delay}s")
+                await self._set_status(definition, envelope["id"], "retrying", attempt, error=error,
+                                       pending_seconds=delay)
+                await self._schedule({**envelope, "attempt": attempt}, delay)
+            else:
+                logger.error(f"Job {definition.name} {envelope['id']} failed after {attempt} attempts: {error}")
+                await self._set_status(definition, envelope["id"], "failed", attempt, error=error)
+            return
+
+        await self._set_status(definition, envelope["id"], "succeeded", attempt, result=result)
+
+    async def run_worker(self, concurrency: int, block_seconds: float = 0.5,
+                         stop: asyncio.Event | None = None):
+        """
+        Runs up to `concurrency` jobs at a time until `stop` is set, then waits for them.
+        """
+        stop = stop or asyncio.Event()
+        slots = asyncio.Semaphore(concurrency)
+        running: set[asyncio.Task] = set()
+
+        async def run(raw: bytes):
+            try:
+                await self.process(raw)
+            finally:
+                slots.release()
+
+        while not stop.is_set():
+            await self.promote_due_jobs()
+            await slots.acquire()
+            item = await self.redis.brpop([self.ready_key], timeout=block_seconds)
+            if item is None:
+                slots.release()
+                continue
+            task = asyncio.create_task(run(item[1]))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        if running:
+            await asyncio.wait(running)
+
+
+job_queue = JobQueue(redis_manager.get_connection(settings.RedisDB.REDIS_CONTENT.value))
@@ -1,39 +1,324 @@
-import redis.asyncio as aioredis
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any, Dict
+from functools import wraps
+from typing import Any, Dict, Iterable, Mapping
+
+import msgpack
+import orjson
+import redis
+import redis.asyncio as aioredis
 from pydantic import RedisDsn
+
 from app.core.config import settings
 
 
+class StrCodec:
+    def encode(self, value: Any) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def decode(self, value: bytes) -> Any:
+        return value.decode("utf-8")
+
+
+class BytesCodec:
+    def encode(self, value: bytes) -> bytes:
+        return value
+
+    def decode(self, value: bytes) -> bytes:
+        return value
+
+
+class OrjsonCodec:
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def decode(self, value: bytes) -> Any:
+        return orjson.loads(value)
+
+
+class MsgpackCodec:
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, value: bytes) -> Any:
+        return msgpack.unpackb(value, raw=False)
+
+
+CODECS = {
+    "str": StrCodec(),
+    "bytes": BytesCodec(),
+    "orjson": OrjsonCodec(),
+    "msgpack": MsgpackCodec(),
+}
+
+
+@dataclass
+class CommandStats:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class RedisMetrics:
+    """
+    Per-command latency of every RedisClient call in this process.
+    """
+
+    def __init__(self, slow_call_ms: float):
+        self.slow_call_seconds = slow_call_ms / 1000
+        self.commands: Dict[str, CommandStats] = defaultdict(CommandStats)
+
+    def observe(self, command: str, seconds: float, failed: bool = False):
+        stats = self.commands[command]
+        stats.calls += 1
+        stats.errors += int(failed)
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if seconds >= self.slow_call_seconds:
+            logging.warning(f"Slow Redis call '{command}': {seconds * 1000:.1f} ms")
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            command: {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "avg_ms": stats.total_seconds / stats.calls * 1000 if stats.calls else 0.0,
+                "max_ms": stats.max_seconds * 1000,
+            }
+            for command, stats in self.commands.items()
+        }
+
+
+redis_metrics = RedisMetrics(slow_call_ms=settings.REDIS_SLOW_CALL_MS)
+
+
+def instrumented(command: str):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = False
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                redis_metrics.observe(command, time.perf_counter() - started, failed)
+        return wrapper
+    return decorator
+
+
 class RedisClient:
-    def __init__(self, url: str, db: int = 0):
-        self.redis = aioredis.from_url(url, db=db, decode_responses=True)
+    """
+    Async Redis client whose values go through a codec. Clients of the same logical DB
+    share one connection pool, whatever their codec.
+    """
+
+    def __init__(self, redis: aioredis.Redis, codec: str = "str"):
+        self.redis = redis
+        self.codec = CODECS[codec]
+
+    def _decode(self, value: bytes | None) -> Any:
+        return None if value is None else self.codec.decode(value)
 
-    async def set(self, key: str, value: str) -> Any:
-        await self.redis.set(key, value)
+    @instrumented("set")
+    async def set(self, key: str, value: Any, expiration: timedelta | None = None, nx: bool = False) -> Any:
+        """
+        With `nx`, returns whether the key was set.
+        """
+        ex = None if expiration is None else int(expiration.total_seconds())
+        return bool(await self.redis.set(key, self.codec.encode(value), ex=ex, nx=nx))
 
+    @instrumented("get")
     async def get(self, key: str) -> Any:
-        return await self.redis.get(key)
+        return self._decode(await self.redis.get(key))
 
-    async def setex(self, key: str, expiration: timedelta, value: str) -> Any:
-        await self.redis.setex(key, int(expiration.total_seconds()), value)
+    @instrumented("getdel")
+    async def getdel(self, key: str) -> Any:
+        return self._decode(await self.redis.getdel(key))
 
-    async def delete(self, key: str) -> Any:
-        return await self.redis.delete(key)
+    @instrumented("setex")
+    async def setex(self, key: str, expiration: timedelta, value: Any) -> Any:
+        await self.redis.setex(key, int(expiration.total_seconds()), self.codec.encode(value))
 
+    @instrumented("mget")
+    async def mget(self, keys: Iterable[str]) -> list[Any]:
+        keys = list(keys)
+        if not keys:
+            return []
+        return [self._decode(value) for value in await self.redis.mget(keys)]
+
+    @instrumented("mset")
+    async def mset(self, mapping: Mapping[str, Any], expiration: timedelta | None = None) -> Any:
+        """
+        Sets many keys in one round trip; with an expiration every key gets the same TTL.
+        """
+        if not mapping:
+            return
+        if expiration is None:
+            await self.redis.mset({key: self.codec.encode(value) for key, value in mapping.items()})
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.setex(key, int(expiration.total_seconds()), self.codec.encode(value))
+        await pipe.execute()
+
+    @instrumented("delete")
+    async def delete(self, *keys: str) -> Any:
+        return await self.redis.delete(*keys)
+
+    @instrumented("expire")
     async def expire(self, key: str, expiration: timedelta) -> Any:
         return await self.redis.expire(key, int(expiration.total_seconds()))
 
+    @instrumented("incr")
+    async def incr(self, key: str) -> Any:
+        return await self.redis.incr(key)
+
+    @instrumented("publish")
+    async def publish(self, channel: str, message: str) -> Any:
+        return await self.redis.publish(channel, message)
+
+    @instrumented("setbit")
+    async def setbit(self, key: str, offset: int, value: int) -> Any:
+        return await self.redis.setbit(key, offset, value)
+
+    @instrumented("zincrby")
+    async def zincrby(self, key: str, amount: float, member: str) -> Any:
+        return await self.redis.zincrby(key, amount, member)
+
+    @instrumented("zrevrank")
+    async def zrevrank(self, key: str, member: str) -> Any:
+        return await self.redis.zrevrank(key, member)
+
+    @instrumented("zscore")
+    async def zscore(self, key: str, member: str) -> Any:
+        return await self.redis.zscore(key, member)
+
+    @instrumented("zrevrange")
+    async def zrevrange(self, key: str, start: int, end: int, withscores: bool = False) -> Any:
+        return await self.redis.zrevrange(key, start, end, withscores=withscores)
+
+    @instrumented("zcard")
+    async def zcard(self, key: str) -> Any:
+        return await self.redis.zcard(key)
+
+    async def scan_iter(self, match: str) -> Any:
+        async for key in self.redis.scan_iter(match=match):
+            yield key.decode("utf-8")
+
+    def pipeline(self, transaction: bool = True) -> "RedisBatch":
+        return RedisBatch(self, transaction=transaction)
+
+
+class RedisBatch:
+    """
+    Pipeline that queues commands and sends them in one round trip on execute().
+    Values of get/set/setex/mget go through the client's codec.
+    """
+
+    def __init__(self, client: RedisClient, transaction: bool = True):
+        self._client = client
+        self._pipe = client.redis.pipeline(transaction=transaction)
+        self._decoders: list = []
+
+    def _queue(self, command, *args, decode: bool = False, **kwargs) -> "RedisBatch":
+        command(*args, **kwargs)
+        self._decoders.append(decode)
+        return self
+
+    def __getattr__(self, name: str):
+        command = getattr(self._pipe, name)
+
+        def queue(*args, **kwargs):
+            return self._queue(command, *args, **kwargs)
+        return queue
+
+    def get(self, key: str) -> "RedisBatch":
+        return self._queue(self._pipe.get, key, decode=True)
+
+    def set(self, key: str, value: Any, expiration: timedelta | None = None, nx: bool = False) -> "RedisBatch":
+        ex = None if expiration is None else int(expiration.total_seconds())
+        return self._queue(self._pipe.set, key, self._client.codec.encode(value), ex=ex, nx=nx)
+
+    def setex(self, key: str, expiration: timedelta, value: Any) -> "RedisBatch":
+        return self._queue(self._pipe.setex, key, int(expiration.total_seconds()),
+                           self._client.codec.encode(value))
+
+    def mget(self, keys: Iterable[str]) -> "RedisBatch":
+        return self._queue(self._pipe.mget, list(keys), decode="many")
+
+    async def execute(self) -> list[Any]:
+        started = time.perf_counter()
+        failed = False
+        try:
+            results = await self._pipe.execute()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            redis_metrics.observe("pipeline", time.perf_counter() - started, failed)
+            decoders, self._decoders = self._decoders, []
+
+        decoded = []
+        for decode, result in zip(decoders, results):
+            if decode == "many":
+                result = [self._client._decode(value) for value in result]
+            elif decode:
+                result = self._client._decode(result)
+            decoded.append(result)
+        return decoded
+
 
 class RedisManager:
-    def __init__(self, url: str):
+    """
+    Holds one bounded connection pool per logical DB (Redis selects the DB per
+    connection, so connections cannot be shared across DBs) and hands out clients on it.
+    """
+
+    def __init__(self, url: str, max_connections: int, socket_timeout: float, socket_connect_timeout: float):
         self.redis_url = url
-        self.clients: Dict[int, RedisClient] = {}
+        self.pool_options = {
+            "max_connections": max_connections,
+            "socket_timeout": socket_timeout,
+            "socket_connect_timeout": socket_connect_timeout,
+            "timeout": socket_connect_timeout,
+            "health_check_interval": 30,
+        }
+        self.connections: Dict[int, aioredis.Redis] = {}
+        self.sync_connections: Dict[int, redis.Redis] = {}
+        self.clients: Dict[tuple[int, str], RedisClient] = {}
+
+    def get_connection(self, db: int = 0) -> aioredis.Redis:
+        if db not in self.connections:
+            pool = aioredis.BlockingConnectionPool.from_url(self.redis_url, db=db, **self.pool_options)
+            self.connections[db] = aioredis.Redis(connection_pool=pool)
+        return self.connections[db]
 
-    def get_client(self, db: int = 0) -> RedisClient:
-        if db not in self.clients:
-            self.clients[db] = RedisClient(url=self.redis_url, db=db)
-        return self.clients[db]
+    def get_sync_connection(self, db: int = 0) -> redis.Redis:
+        """
+        Blocking connection for code running in worker threads (sync routes and crud).
+        """
+        if db not in self.sync_connections:
+            pool = redis.BlockingConnectionPool.from_url(self.redis_url, db=db, **self.pool_options)
+            self.sync_connections[db] = redis.Redis(connection_pool=pool)
+        return self.sync_connections[db]
+
+    def get_client(self, db: int = 0, codec: str = "str") -> RedisClient:
+        if (db, codec) not in self.clients:
+            self.clients[(db, codec)] = RedisClient(self.get_connection(db), codec=codec)
+        return self.clients[(db, codec)]
+
+    async def close(self):
+        for connection in self.connections.values():
+            await connection.aclose()
+        self.connections.clear()
+        self.clients.clear()
 
 
 redis_url = RedisDsn.build(
@@ -42,4 +327,9 @@ redis_url = RedisDsn.build(
     port=settings.REDIS_PORT,
     password=settings.REDIS_PASSWORD or None,
 )
-redis_manager = RedisManager(url=str(redis_url))
+redis_manager = RedisManager(
+    url=str(redis_url),
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
+)
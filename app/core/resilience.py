@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+
+T = TypeVar("T")
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency after `failure_threshold` consecutive failures. After
+    `reset_seconds` one probe call is let through (half-open): its success closes the
+    circuit, its failure opens it for another `reset_seconds`.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info(f"Circuit '{self.name}' closed.")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning(f"Circuit '{self.name}' opened after {self.failures} failures.")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    async def call(self, fn: Callable[[], Awaitable[T]], timeout: float) -> T:
+        """
+        Runs `fn()` with a timeout; raises CircuitOpen without calling it while the circuit is open.
+        """
+        if not self.allow():
+            raise CircuitOpen(self.name)
+        try:
+            result = await asyncio.wait_for(fn(), timeout=timeout)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._probing = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected_calls": self.rejected,
+        }
+
+
+class RevocationCheckUnavailable(Exception):
+    pass
+
+
+class TokenRevocationChecker:
+    """
+    Checks the token blacklist without letting Redis set the API latency: lookups have
+    a tight timeout and go through the Redis circuit breaker, and tokens recently found
+    not revoked are remembered locally for a few seconds. When Redis cannot answer, the
+    token is accepted (fail open) or RevocationCheckUnavailable is raised (fail closed).
+    """
+
+    def __init__(self, breaker: CircuitBreaker, timeout: float, negative_ttl: float, negative_cache_size: int,
+                 fail_open: bool):
+        self.breaker = breaker
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self.negative_cache_size = negative_cache_size
+        self.fail_open = fail_open
+        self._not_revoked: OrderedDict[str, float] = OrderedDict()
+        self.degraded_checks = 0
+
+    def _cached_not_revoked(self, token: str) -> bool:
+        expires_at = self._not_revoked.get(token)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            self._not_revoked.pop(token, None)
+            return False
+        return True
+
+    def _remember_not_revoked(self, token: str):
+        self._not_revoked[token] = time.monotonic() + self.negative_ttl
+        self._not_revoked.move_to_end(token)
+        while len(self._not_revoked) > self.negative_cache_size:
+            self._not_revoked.popitem(last=False)
+
+    def forget(self, token: str):
+        """
+        Drops the local "not revoked" answer, called when the token is revoked in this worker.
+        """
+        self._not_revoked.pop(token, None)
+
+    async def is_revoked(self, redis: RedisClient, token: str) -> bool:
+        if self._cached_not_revoked(token):
+            return False
+        try:
+            revoked = bool(await self.breaker.call(lambda: redis.get(token), timeout=self.timeout))
+        except Exception as e:
+            self.degraded_checks += 1
+            if self.fail_open:
+                logging.warning(f"Token revocation check skipped, Redis unavailable: {type(e).__name__}")
+                return False
+            raise RevocationCheckUnavailable() from e
+        if not revoked:
+            self._remember_not_revoked(token)
+        return revoked
+
+    def snapshot(self) -> dict:
+        return {
+            "policy": "fail_open" if self.fail_open else "fail_closed",
+            "degraded_checks": self.degraded_checks,
+            "cached_tokens": len(self._not_revoked),
+        }
+
+
+redis_breaker = CircuitBreaker(
+    name="redis",
+    failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=settings.REDIS_BREAKER_RESET_SECONDS,
+)
+token_revocation = TokenRevocationChecker(
+    breaker=redis_breaker,
+    timeout=settings.REDIS_GUARDED_CALL_TIMEOUT_SECONDS,
+    negative_ttl=settings.TOKEN_REVOCATION_CACHE_SECONDS,
+    negative_cache_size=settings.TOKEN_REVOCATION_CACHE_SIZE,
+    fail_open=settings.TOKEN_REVOCATION_FAIL_OPEN,
+)
@@ -0,0 +1,98 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Searchable text columns per table.
+SEARCH_FIELDS = {
+    "place": ("title", "description"),
+    "story": ("title", "description"),
+    "quest": ("title", "description"),
+    "city": ("title",),
+}
+
+SEARCH_CONFIG = "simple"
+
+
+def tsvector_sql(fields: tuple[str, ...]) -> str:
+    document = " || ' ' || ".join(f"coalesce({field}, '')" for field in fields)
+    return f"to_tsvector('{SEARCH_CONFIG}'::regconfig, {document})"
+
+
+def search_index_ddl() -> list[str]:
+    """
+    Trigram indexes for fuzzy matching and a tsvector index for ranked full-text matching.
+    """
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for table, fields in SEARCH_FIELDS.items():
+        for field in fields:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{field}_trgm ON {table} "
+                f"USING gin ({field} gin_trgm_ops)"
+            )
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_tsv ON {table} USING gin ({tsvector_sql(fields)})"
+        )
+    return statements
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(text: str | None) -> set[str]:
+    """
+    Trigrams the way pg_trgm builds them: lower-cased words padded with two leading
+    spaces and one trailing space.
+    """
+    result = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    entity: str
+    id: int
+    title: str
+    description: str | None
+
+
+class InMemorySearchIndex:
+    """
+    Trigram inverted index used instead of Postgres when the database cannot run
+    pg_trgm queries (e.g. SQLite in tests).
+    """
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+        self._documents: list[SearchDocument] = []
+        self._postings: dict[str, set[int]] = defaultdict(set)
+
+    def add(self, document: SearchDocument):
+        position = len(self._documents)
+        self._documents.append(document)
+        for gram in trigrams(document.title) | trigrams(document.description):
+            self._postings[gram].add(position)
+
+    def search(self, query: str, entities: set[str] | None = None) -> list[tuple[SearchDocument, float]]:
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        matches: dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for position in self._postings.get(gram, ()):
+                matches[position] += 1
+
+        results = []
+        for position, shared in matches.items():
+            document = self._documents[position]
+            if entities and document.entity not in entities:
+                continue
+            score = shared / len(query_grams)
+            if score >= self.threshold:
+                results.append((document, score))
+
+        results.sort(key=lambda item: (-item[1], item[0].entity, item[0].id))
+        return results
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Hashable
+
+import orjson
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.redis import redis_manager
+
+REDIS_KEY_PREFIX = "singleflight"
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time in this process: concurrent callers with the
+    same key wait for the in-flight call and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+# Deletes the lock only while it still holds the caller's token, so a leader whose lock
+# expired never releases the lock of the worker that took it over.
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisSingleFlight:
+    """
+    Coalesces loads across workers: the worker that takes the Redis lock computes the
+    value, publishes it and announces it on a per-key channel; the others block on that
+    channel instead of loading (or polling). Values must be JSON-serializable.
+    """
+
+    def __init__(self, lock_seconds: float):
+        self.lock_seconds = lock_seconds
+        self._release_lock = None
+
+    def _release(self, redis, lock_key: str, token: str):
+        if self._release_lock is None:
+            self._release_lock = redis.register_script(RELEASE_LOCK_SCRIPT)
+        self._release_lock(keys=[lock_key], args=[token])
+
+    def do(self, key: str, ttl: float, fn: Callable, *args, **kwargs) -> Any:
+        redis = redis_manager.get_sync_connection(settings.RedisDB.REDIS_CONTENT.value)
+        value_key = f"{REDIS_KEY_PREFIX}:{key}:value"
+        lock_key, done_channel = f"{REDIS_KEY_PREFIX}:{key}:lock", f"{REDIS_KEY_PREFIX}:{key}:done"
+
+        cached = redis.get(value_key)
+        if cached is not None:
+            return orjson.loads(cached)
+
+        token = uuid.uuid4().hex
+        if redis.set(lock_key, token, nx=True, px=int(self.lock_seconds * 1000)):
+            try:
+                result = fn(*args, **kwargs)
+                redis.set(value_key, orjson.dumps(result), px=max(int(ttl * 1000), 1))
+                return result
+            finally:
+                self._release(redis, lock_key, token)
+                # Also on failure, so the waiting workers load locally right away.
+                redis.publish(done_channel, "1")
+
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(done_channel)
+            # Checked after subscribing, so a leader that finished meanwhile is not missed.
+            deadline = time.monotonic() + self.lock_seconds
+            while redis.exists(lock_key) and (remaining := deadline - time.monotonic()) > 0:
+                if pubsub.get_message(timeout=remaining) is not None:
+                    break
+            cached = redis.get(value_key)
+            if cached is not None:
+                return orjson.loads(cached)
+        finally:
+            pubsub.close()
+        logging.warning(f"No single-flight value for '{key}' from the leader, loading locally.")
+        return fn(*args, **kwargs)
+
+    def invalidate(self, key: str):
+        redis = redis_manager.get_sync_connection(settings.RedisDB.REDIS_CONTENT.value)
+        redis.delete(f"{REDIS_KEY_PREFIX}:{key}:value")
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class CachedLoader:
+    """
+    In-process cache in front of a loader with single-flight misses and
+    stale-while-revalidate: after `ttl` the old value is still served for `stale_ttl`
+    seconds while one background refresh replaces it.
+    """
+
+    _refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0.0,
+                 shared: RedisSingleFlight | None = None):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.shared = shared
+        # Part of the shared Redis keys, so that invalidating moves every worker to new keys.
+        self.generation: Hashable = 0
+        self._flight = SingleFlight()
+        self._entries: dict[Hashable, _Entry] = {}
+        self._refreshing: set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def _redis_key(self, key: Hashable) -> str:
+        return f"{self.name}:{self.generation!r}:{key!r}"
+
+    def _load(self, key: Hashable, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        if self.shared is not None:
+            value = self.shared.do(self._redis_key(key), self.ttl, fn, *args, **kwargs)
+        else:
+            value = fn(*args, **kwargs)
+        now = time.monotonic()
+        self._entries[key] = _Entry(value, now + self.ttl, now + self.ttl + self.stale_ttl)
+        return value
+
+    def _refresh(self, key: Hashable, fn: Callable, bind: Any, args: tuple, kwargs: dict):
+        try:
+            if self.shared is not None:
+                self.shared.invalidate(self._redis_key(key))
+            # The request that triggered the refresh has finished, so it gets its own session.
+            with Session(bind) as session:
+                self._flight.do(key, self._load, key, fn, (session, *args), kwargs)
+        except Exception as e:
+            logging.error(f"Background refresh of '{self.name}' failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key: Hashable, fn: Callable, session: Session, *args, **kwargs) -> Any:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now < entry.fresh_until:
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            with self._lock:
+                start = key not in self._refreshing
+                self._refreshing.add(key)
+            if start:
+                self._refresh_executor.submit(self._refresh, key, fn, session.get_bind(), args, kwargs)
+            return entry.value
+
+        return self._flight.do(key, self._load, key, fn, (session, *args), kwargs)
+
+    def invalidate(self, generation: Hashable | None = None):
+        """
+        Drops this worker's entries. Shared values stay in Redis until they expire, so pass
+        a `generation` all workers agree on (e.g. the catalog version) to stop reading them.
+        """
+        if generation is not None:
+            self.generation = generation
+        self._entries.clear()
+
+
+def single_flight(ttl: float, stale_ttl: float = 0.0, shared: bool = False):
+    """
+    Decorates a crud loader `fn(session, *args, **kwargs)`: identical concurrent calls share
+    one query, results are cached for `ttl` seconds and served stale for `stale_ttl` more
+    while they refresh. With `shared=True` the load is also coalesced across workers
+    through Redis, which requires a JSON-serializable result.
+    """
+    def decorator(fn):
+        loader = CachedLoader(
+            name=f"{fn.__module__}.{fn.__qualname__}",
+            ttl=ttl,
+            stale_ttl=stale_ttl,
+            shared=RedisSingleFlight(lock_seconds=settings.SINGLE_FLIGHT_LOCK_SECONDS) if shared else None,
+        )
+
+        @wraps(fn)
+        def wrapper(session: Session, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return loader.get(key, fn, session, *args, **kwargs)
+
+        wrapper.loader = loader
+        return wrapper
+    return decorator
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import Engine, text
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.catalog import catalog_store
+from app.core.config import settings
+from app.core.db_routing import replica_router
+from app.core.queue import job_queue
+from app.core.redis import RedisClient, redis_manager
+from app.models import ReadinessPublic, WarmupStepPublic
+
+POPULAR_QUESTS_KEY = "warmup:popular-quests"
+POPULAR_QUESTS_REFRESH_KEY = "warmup:popular-quests:refresh"
+
+
+def _open_pool(engine: Engine) -> int:
+    """
+    Checks out as many connections as the pool keeps open and returns them, so the pool
+    holds its full size of established connections.
+    """
+    connections = []
+    try:
+        for _ in range(engine.pool.size()):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def _warm_database_pools() -> str:
+    engines = [replica_router.primary, *replica_router.replicas]
+    opened = sum(_open_pool(engine) for engine in engines)
+    return f"{opened} connections on {len(engines)} engines"
+
+
+async def _warm_redis_pools(connections: int) -> str:
+    for db in settings.RedisDB:
+        redis = redis_manager.get_connection(db.value)
+        # Concurrent commands each take their own connection from the pool.
+        await asyncio.gather(*(redis.ping() for _ in range(connections)))
+        sync_redis = redis_manager.get_sync_connection(db.value)
+        await asyncio.gather(*(run_in_threadpool(sync_redis.ping) for _ in range(connections)))
+    return f"{connections} async and {connections} sync connections on {len(settings.RedisDB)} DBs"
+
+
+def _warm_catalog() -> str:
+    snapshot = catalog_store.get()
+    return f"snapshot version {snapshot.version}"
+
+
+async def load_popular_quest_ids(redis: RedisClient) -> list[int] | None:
+    quest_ids = await redis.get(POPULAR_QUESTS_KEY)
+    return None if quest_ids is None else [int(quest_id) for quest_id in quest_ids.split(",") if quest_id]
+
+
+async def store_popular_quest_ids(redis: RedisClient, quest_ids: list[int], ttl: timedelta):
+    await redis.setex(POPULAR_QUESTS_KEY, ttl, ",".join(map(str, quest_ids)))
+
+
+def _warm_quests(quest_ids: list[int]) -> str:
+    """
+    Loads the detail of the given quests and the city list into the crud cache. Running the
+    queries also fills SQLAlchemy's compiled statement cache for them.
+    """
+    with Session(replica_router.get_read_engine()) as session:
+        for quest_id in quest_ids:
+            crud.get_quest_detail(session, quest_id)
+        cities = crud.get_all_cities(session)
+    return f"{len(quest_ids)} quests, {len(cities)} cities"
+
+
+async def _warm_popular_quests() -> str:
+    """
+    Warms the most played quests from the list precomputed by the refresh_popular_quests
+    job. When the list has expired, the first worker to notice enqueues the job and this
+    start warms the cities only.
+    """
+    redis = redis_manager.get_client(db=settings.RedisDB.REDIS_CONTENT.value)
+    quest_ids = await load_popular_quest_ids(redis)
+    if quest_ids is None:
+        if await redis.set(POPULAR_QUESTS_REFRESH_KEY, "1", nx=True,
+                           expiration=timedelta(seconds=settings.WARMUP_POPULAR_QUESTS_TTL_SECONDS)):
+            await job_queue.enqueue("refresh_popular_quests", {"limit": settings.WARMUP_POPULAR_QUESTS})
+        return await run_in_threadpool(_warm_quests, []) + "; popular quest list not computed yet"
+    return await run_in_threadpool(_warm_quests, quest_ids)
+
+
+class ReadinessBoard:
+    """
+    Readiness shared by the uvicorn workers of one server (app.serve), through marker files
+    named after the pids of the workers that finished their warm-up. The server is ready
+    while at least `workers` live workers are; a worker recycled after SERVER_MAX_REQUESTS
+    makes it unready until its replacement has warmed up. Without a directory (a single
+    process, e.g. `fastapi run`) only this process counts.
+    """
+
+    def __init__(self, directory: str | None, workers: int):
+        self.directory = directory
+        self.workers = workers if directory else 1
+
+    def _remove(self, pid: int):
+        try:
+            os.remove(os.path.join(self.directory, str(pid)))
+        except FileNotFoundError:
+            pass
+
+    def mark_ready(self):
+        if self.directory:
+            open(os.path.join(self.directory, str(os.getpid())), "w").close()
+
+    def clear(self):
+        if self.directory:
+            self._remove(os.getpid())
+
+    def ready_workers(self, ready: bool) -> int:
+        """
+        Number of live ready workers; `ready` is this process' own state, used when the
+        board is not shared.
+        """
+        if not self.directory:
+            return int(ready)
+        count = 0
+        for name in os.listdir(self.directory):
+            try:
+                os.kill(int(name), 0)
+            except ProcessLookupError:
+                # A worker that died without shutting down cleanly.
+                self._remove(int(name))
+                continue
+            except PermissionError:
+                pass
+            count += 1
+        return count
+
+
+class Warmup:
+    """
+    Startup stage that opens the DB and Redis pools, builds the catalog snapshot and
+    loads the most played quests before the worker reports ready. It runs in the
+    background so the liveness check answers meanwhile; steps left when `budget_seconds`
+    runs out are skipped, and the worker becomes ready either way.
+
+    A step cut off by the budget may keep running in its worker thread until it finishes.
+    """
+
+    def __init__(self, budget_seconds: float, redis_connections: int, board: ReadinessBoard):
+        self.budget_seconds = budget_seconds
+        self.board = board
+        self.steps_plan: list[tuple[str, Callable[[], Awaitable[str]]]] = [
+            ("database_pools", lambda: run_in_threadpool(_warm_database_pools)),
+            ("redis_pools", lambda: _warm_redis_pools(redis_connections)),
+            ("catalog", lambda: run_in_threadpool(_warm_catalog)),
+            ("popular_quests", _warm_popular_quests),
+        ]
+        self.steps: list[WarmupStepPublic] = []
+        self.ready = False
+        self.duration_ms = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def run(self):
+        started = time.monotonic()
+        deadline = started + self.budget_seconds
+        for name, step in self.steps_plan:
+            step_started = time.monotonic()
+            remaining = deadline - step_started
+            if remaining <= 0:
+                self.steps.append(WarmupStepPublic(name=name, status="skipped", duration_ms=0.0,
+                                                   detail="time budget exhausted"))
+                continue
+            try:
+                status, detail = "ok", await asyncio.wait_for(step(), timeout=remaining)
+            except asyncio.TimeoutError:
+                status, detail = "timed_out", f"exceeded the remaining {remaining:.1f}s of the budget"
+            except Exception as e:
+                status, detail = "failed", f"{type(e).__name__}: {e}"
+            duration_ms = (time.monotonic() - step_started) * 1000
+            self.steps.append(WarmupStepPublic(name=name, status=status, duration_ms=duration_ms, detail=detail))
+            logging.info(f"Warm-up step '{name}' {status}: {detail}")
+
+        self.duration_ms = (time.monotonic() - started) * 1000
+        self.ready = True
+        self.board.mark_ready()
+        logging.info(f"Warm-up finished in {self.duration_ms:.0f} ms.")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.board.clear()
+
+    def snapshot(self) -> ReadinessPublic:
+        workers_ready = self.board.ready_workers(self.ready)
+        return ReadinessPublic(
+            ready=self.ready and workers_ready >= self.board.workers,
+            workers=self.board.workers,
+            workers_ready=workers_ready,
+            budget_seconds=self.budget_seconds,
+            duration_ms=self.duration_ms,
+            steps=list(self.steps),
+        )
+
+
+warmup = Warmup(
+    budget_seconds=settings.WARMUP_BUDGET_SECONDS,
+    redis_connections=settings.WARMUP_REDIS_CONNECTIONS,
+    board=ReadinessBoard(settings.SERVER_READINESS_DIR, settings.SERVER_WORKERS or 1),
+)
@@ -1,3 +1,12 @@
 from .user import *
 from .quest import *
 from .city import *
+from .leaderboard import *
+from .subscription import *
+from .sync import *
+from .search import *
+from .content_import import *
+from .place import *
+from .story import *
+from .export import *
+from .progress import *
@@ -1,6 +1,5 @@
-from sqlmodel import Session, select
-from app.models import City, UserQuest, Quest, QuestStatusEnum
-from app.api.deps import CurrentUser
+from sqlmodel import Session, func, select
+from app.models import City, UserQuest, Quest, QuestStatusEnum, User
 
 
 def get_city_by_id(session: Session, city_id: int) -> City:
@@ -11,15 +10,37 @@ def get_all_cities(session: Session):
     return session.exec(select(City)).all()
 
 
+def get_city_locations(session: Session):
+    return session.exec(
+        select(City.id, City.title, City.picture_small_url, City.latitude, City.longitude)
+    ).all()
+
+
 def get_quests_by_city(session: Session, city_id: int):
-    return session.exec(select(Quest).where(Quest.city_id == city_id)).count()
+    return session.exec(select(Quest).where(Quest.city_id == city_id)).all()
 
 
-def get_completed_quests_by_city_and_user(session: Session, city_id: int, current_user: CurrentUser):
+def get_completed_quests_by_city_and_user(session: Session, city_id: int, current_user: User) -> int:
+    # The user_id filter on UserQuest prunes the scan to the user's partition.
     return session.exec(
-        select(Quest)
+        select(func.count(Quest.id))
         .join(UserQuest, Quest.id == UserQuest.quest_id)
         .where(Quest.city_id == city_id)
         .where(UserQuest.user_id == current_user.id)
         .where(UserQuest.status == QuestStatusEnum.completed)
-    ).count()
+    ).one()
+
+
+def get_city_quest_progress(session: Session, user_id: int) -> dict[int, tuple[int, int]]:
+    """
+    Returns {city_id: (quests, quests completed by the user)} for every city with quests,
+    in one query instead of two per city.
+    """
+    statement = (
+        select(Quest.city_id, func.count(Quest.id), func.count(UserQuest.id))
+        .outerjoin(UserQuest, (UserQuest.quest_id == Quest.id)
+                   & (UserQuest.user_id == user_id)
+                   & (UserQuest.status == QuestStatusEnum.completed))
+        .group_by(Quest.city_id)
+    )
+    return {city_id: (total, completed) for city_id, total, completed in session.exec(statement)}
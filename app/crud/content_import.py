@@ -0,0 +1,71 @@
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+# Imported tables and their columns, in foreign key (merge) order.
+IMPORT_TABLES: dict[str, tuple[str, ...]] = {
+    "city": ("id", "title", "latitude", "longitude", "picture_small_url", "description"),
+    "artifact": ("id", "name", "description"),
+    "artifactpiece": ("id", "artifact_id", "name", "description"),
+    "quest": ("id", "title", "description", "city_id", "is_premium"),
+    "mission": ("id", "quest_id", "name", "description", "mission_order", "reward_artifact_piece_id", "city_id"),
+    "dialogue": ("id", "mission_id", "character_name", "text", "background_url", "character_image_url", "order"),
+}
+
+# Tables whose created_at is filled by the application, not by the database.
+TABLES_WITH_CREATED_AT = {"city"}
+
+
+def _columns(columns: Iterable[str]) -> str:
+    return ", ".join(f'"{column}"' for column in columns)
+
+
+def _staging_table(table: str) -> str:
+    return f"import_{table}"
+
+
+def create_staging_table(session: Session, table: str):
+    columns = _columns(IMPORT_TABLES[table])
+    session.execute(text(
+        f'CREATE TEMP TABLE {_staging_table(table)} ON COMMIT DROP AS '
+        f'SELECT {columns} FROM "{table}" WITH NO DATA'
+    ))
+
+
+def copy_into_staging(session: Session, table: str, rows: Iterable[tuple]) -> int:
+    """
+    Loads rows into the staging table with COPY FROM STDIN on the session's connection.
+    """
+    columns = IMPORT_TABLES[table]
+    cursor = session.connection().connection.driver_connection.cursor()
+    copied = 0
+    with cursor.copy(f"COPY {_staging_table(table)} ({_columns(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+            copied += 1
+    return copied
+
+
+def merge_staging_table(session: Session, table: str) -> int:
+    """
+    Upserts the staged rows into the real table by id and moves its id sequence past them.
+    """
+    columns = IMPORT_TABLES[table]
+    insert_columns = _columns(columns)
+    select_columns = insert_columns
+    if table in TABLES_WITH_CREATED_AT:
+        insert_columns += ", created_at"
+        select_columns += ", timezone('utc', now())"
+    updates = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in columns if column != "id")
+
+    result = session.execute(text(
+        f'INSERT INTO "{table}" ({insert_columns}) '
+        f'SELECT {select_columns} FROM {_staging_table(table)} '
+        f'ON CONFLICT (id) DO UPDATE SET {updates}'
+    ))
+    session.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+        f'(SELECT coalesce(max(id), 1) FROM "{table}"))'
+    ))
+    return result.rowcount
@@ -0,0 +1,32 @@
+from typing import Iterator
+
+from sqlmodel import Session, SQLModel, select
+
+from app.models import Place, Quest, Story, UserMission, UserQuest
+
+EXPORT_TABLES: dict[str, type[SQLModel]] = {
+    "places": Place,
+    "stories": Story,
+    "quests": Quest,
+    "user_quests": UserQuest,
+    "user_missions": UserMission,
+}
+
+
+def get_export_columns(entity: str) -> list[str]:
+    return [column.name for column in EXPORT_TABLES[entity].__table__.columns]
+
+
+def stream_export_rows(session: Session, entity: str, batch_size: int) -> Iterator[tuple]:
+    """
+    Yields every row of the table as a plain tuple in primary key order. Rows come from a
+    server-side cursor `batch_size` at a time, so memory does not grow with the table.
+    """
+    table = EXPORT_TABLES[entity].__table__
+    statement = (
+        select(*table.columns)
+        .order_by(*table.primary_key.columns)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in session.execute(statement):
+        yield tuple(row)
@@ -0,0 +1,41 @@
+from typing import Iterator
+
+from sqlmodel import Session, select, func
+
+from app.models import (
+    LeaderboardMetricEnum,
+    Mission,
+    MissionStatusEnum,
+    Quest,
+    QuestStatusEnum,
+    UserMission,
+    UserQuest,
+)
+
+
+def stream_leaderboard_scores(session: Session, metric: LeaderboardMetricEnum,
+                              batch_size: int = 1000) -> Iterator[tuple[int, int, int]]:
+    """
+    Streams (user_id, city_id, score) rows with a server-side cursor.
+    """
+    if metric == LeaderboardMetricEnum.quests:
+        statement = (
+            select(UserQuest.user_id, Quest.city_id, func.count(UserQuest.id))
+            .join(Quest, Quest.id == UserQuest.quest_id)
+            .where(UserQuest.status == QuestStatusEnum.completed)
+            .group_by(UserQuest.user_id, Quest.city_id)
+        )
+    else:
+        # Same city as complete_mission: the mission's own city, else its quest's.
+        city_id = func.coalesce(Mission.city_id, Quest.city_id)
+        statement = (
+            select(UserMission.user_id, city_id, func.count(Mission.reward_artifact_piece_id.distinct()))
+            .join(Mission, Mission.id == UserMission.mission_id)
+            .join(Quest, Quest.id == Mission.quest_id)
+            .where(UserMission.status == MissionStatusEnum.completed)
+            .where(Mission.reward_artifact_piece_id.is_not(None))
+            .group_by(UserMission.user_id, city_id)
+        )
+
+    for user_id, city_id, score in session.exec(statement.execution_options(yield_per=batch_size)):
+        yield user_id, city_id, score
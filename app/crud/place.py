@@ -0,0 +1,22 @@
+from sqlmodel import Session, select
+from app.models import Place
+
+
+def get_places(session: Session):
+    """
+    Returns plain rows with the columns the catalog needs; rows are not tracked by the session.
+    """
+    statement = (
+        select(
+            Place.id,
+            Place.title,
+            Place.description,
+            Place.latitude,
+            Place.longitude,
+            Place.picture_small_url,
+            Place.picture_big_url,
+            Place.geofence_radius,
+        )
+        .order_by(Place.created_at.desc())
+    )
+    return session.exec(statement).all()
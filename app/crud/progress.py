@@ -0,0 +1,95 @@
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, func, select
+
+from app.models import (
+    Artifact,
+    ArtifactPiece,
+    Mission,
+    MissionStatusEnum,
+    QuestStatusEnum,
+    UserMission,
+    UserQuest,
+)
+
+
+def get_artifact_pieces(session: Session):
+    """
+    Returns (artifact_id, artifact_name, piece_id) rows of every artifact piece.
+    """
+    statement = (
+        select(Artifact.id, Artifact.name, ArtifactPiece.id)
+        .join(ArtifactPiece, ArtifactPiece.artifact_id == Artifact.id)
+        .order_by(Artifact.id, ArtifactPiece.id)
+    )
+    return session.exec(statement).all()
+
+
+def get_collected_piece_ids(session: Session, user_id: int) -> list[int]:
+    """
+    Artifact pieces the user was rewarded with for completed missions.
+    """
+    statement = (
+        select(Mission.reward_artifact_piece_id)
+        .join(UserMission, UserMission.mission_id == Mission.id)
+        .where(UserMission.user_id == user_id)
+        .where(UserMission.status == MissionStatusEnum.completed)
+        .where(Mission.reward_artifact_piece_id.is_not(None))
+        .distinct()
+    )
+    return list(session.exec(statement).all())
+
+
+def get_user_quest(session: Session, user_id: int, quest_id: int) -> UserQuest | None:
+    return session.exec(
+        select(UserQuest).where(UserQuest.user_id == user_id).where(UserQuest.quest_id == quest_id)
+    ).first()
+
+
+def complete_user_mission(session: Session, user_id: int, mission_id: int) -> bool:
+    """
+    Marks the mission completed for the user; returns False if it already was.
+    """
+    user_mission = session.exec(
+        select(UserMission).where(UserMission.user_id == user_id).where(UserMission.mission_id == mission_id)
+    ).first()
+    if user_mission and user_mission.status == MissionStatusEnum.completed:
+        return False
+    if user_mission is None:
+        user_mission = UserMission(user_id=user_id, mission_id=mission_id)
+    user_mission.status = MissionStatusEnum.completed
+    session.add(user_mission)
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent request inserted the same (user_id, mission_id) first.
+        session.rollback()
+        return False
+    return True
+
+
+def complete_quest_if_done(session: Session, user_quest: UserQuest) -> bool:
+    """
+    Completes the user's quest once all of its missions are completed; returns True only
+    for the request whose update completed it, so concurrent completions count once.
+    """
+    remaining = session.exec(
+        select(func.count(Mission.id))
+        .where(Mission.quest_id == user_quest.quest_id)
+        .where(Mission.id.not_in(
+            select(UserMission.mission_id)
+            .where(UserMission.user_id == user_quest.user_id)
+            .where(UserMission.status == MissionStatusEnum.completed)
+        ))
+    ).one()
+    if remaining:
+        return False
+    result = session.execute(
+        update(UserQuest)
+        .where(UserQuest.id == user_quest.id)
+        .where(UserQuest.user_id == user_quest.user_id)
+        .where(UserQuest.status == QuestStatusEnum.in_progress)
+        .values(status=QuestStatusEnum.completed)
+    )
+    session.commit()
+    return result.rowcount == 1
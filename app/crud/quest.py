@@ -1,11 +1,126 @@
-from sqlmodel import Session, select
-from app.models import Quest, City
+from sqlmodel import Session, func, select
+from app.core.config import settings
+from app.core.singleflight import single_flight
+from app.models import Quest, City, Mission, Dialogue, UserQuest, UserMission, QuestStatusEnum, MissionStatusEnum
 
 
 def get_quests_with_cities(session: Session):
+    """
+    Returns plain rows of quest columns with the title and picture of the quest's city.
+    """
     statement = (
-        select(Quest, City)
+        select(
+            Quest.id,
+            Quest.title,
+            Quest.description,
+            Quest.is_premium,
+            City.title.label("city_title"),
+            City.picture_small_url.label("city_picture_small_url"),
+        )
         .join(City, City.id == Quest.city_id)
         .order_by(Quest.id)
     )
-    return session.exec(statement).all()
\ No newline at end of file
+    return session.exec(statement).all()
+
+
+def get_quest_by_id(session: Session, quest_id: int) -> Quest | None:
+    return session.get(Quest, quest_id)
+
+
+def get_missions_with_dialogues(session: Session, quest_id: int) -> list[tuple[Mission, list[Dialogue]]]:
+    """
+    Loads the ordered missions of a quest together with their ordered dialogues in one query.
+    """
+    statement = (
+        select(Mission, Dialogue)
+        .outerjoin(Dialogue, Dialogue.mission_id == Mission.id)
+        .where(Mission.quest_id == quest_id)
+        .order_by(Mission.mission_order, Mission.id, Dialogue.order, Dialogue.id)
+    )
+    missions: dict[int, tuple[Mission, list[Dialogue]]] = {}
+    for mission, dialogue in session.exec(statement):
+        _, dialogues = missions.setdefault(mission.id, (mission, []))
+        if dialogue is not None:
+            dialogues.append(dialogue)
+    return list(missions.values())
+
+
+@single_flight(ttl=settings.CATALOG_CACHE_TTL_SECONDS, stale_ttl=settings.CATALOG_CACHE_STALE_SECONDS, shared=True)
+def get_quest_detail(session: Session, quest_id: int) -> dict | None:
+    """
+    A quest with its ordered missions and dialogues as plain data; media fields hold object names.
+    """
+    quest = get_quest_by_id(session, quest_id)
+    if not quest:
+        return None
+
+    return {
+        "quest_id": quest.id,
+        "title": quest.title,
+        "description": quest.description,
+        "missions": [
+            {
+                "mission_id": mission.id,
+                "name": mission.name,
+                "description": mission.description,
+                "dialogues": [
+                    {
+                        "character_name": d.character_name,
+                        "text": d.text,
+                        "background_url": d.background_url,
+                        "character_image_url": d.character_image_url,
+                    }
+                    for d in dialogues
+                ],
+            }
+            for mission, dialogues in get_missions_with_dialogues(session, quest_id)
+        ],
+    }
+
+
+def get_mission_geofences(session: Session):
+    """
+    Returns (mission_id, latitude, longitude, radius) of every mission with a geofence,
+    centred on the mission's city or, for missions without one, on the quest's city.
+    """
+    statement = (
+        select(Mission.id, City.latitude, City.longitude, Mission.geofence_radius)
+        .join(Quest, Quest.id == Mission.quest_id)
+        .join(City, City.id == func.coalesce(Mission.city_id, Quest.city_id))
+        .where(Mission.geofence_radius.is_not(None))
+    )
+    return session.exec(statement).all()
+
+
+def get_open_mission_ids(session: Session, user_id: int, mission_ids: list[int]) -> set[int]:
+    """
+    Filters the missions down to those of the user's in-progress quests that the user has
+    not completed yet.
+    """
+    completed = (
+        select(UserMission.mission_id)
+        .where(UserMission.user_id == user_id)
+        .where(UserMission.status == MissionStatusEnum.completed)
+    )
+    statement = (
+        select(Mission.id)
+        .join(UserQuest, UserQuest.quest_id == Mission.quest_id)
+        .where(UserQuest.user_id == user_id)
+        .where(UserQuest.status == QuestStatusEnum.in_progress)
+        .where(Mission.id.in_(mission_ids))
+        .where(Mission.id.not_in(completed))
+    )
+    return set(session.exec(statement).all())
+
+
+def get_popular_quest_ids(session: Session, limit: int) -> list[int]:
+    """
+    Quests with the most players, most played first.
+    """
+    statement = (
+        select(UserQuest.quest_id)
+        .group_by(UserQuest.quest_id)
+        .order_by(func.count().desc(), UserQuest.quest_id)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
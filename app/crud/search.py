@@ -0,0 +1,81 @@
+from sqlalchemy import literal, literal_column, null, or_, union_all
+from sqlmodel import Session, select, func
+
+from app.core.search_index import InMemorySearchIndex, SearchDocument, SEARCH_FIELDS, tsvector_sql
+from app.models import City, Place, Quest, SearchEntityEnum, SearchHit, Story
+
+SEARCH_MODELS = {
+    SearchEntityEnum.places: Place,
+    SearchEntityEnum.stories: Story,
+    SearchEntityEnum.quests: Quest,
+    SearchEntityEnum.cities: City,
+}
+
+
+def _entity_statement(entity: SearchEntityEnum, query: str):
+    model = SEARCH_MODELS[entity]
+    fields = SEARCH_FIELDS[model.__tablename__]
+    columns = [getattr(model, field) for field in fields]
+    # Rendered literally so the expression matches the ix_<table>_search_tsv index.
+    document = literal_column(tsvector_sql(fields))
+    tsquery = func.plainto_tsquery(literal_column("'simple'::regconfig"), query)
+
+    similarity = func.greatest(*(func.coalesce(func.word_similarity(query, column), 0) for column in columns))
+    score = similarity + func.ts_rank(document, tsquery)
+
+    return (
+        select(
+            literal(entity.value).label("entity"),
+            model.id.label("id"),
+            model.title.label("title"),
+            (model.description if "description" in fields else null()).label("description"),
+            score.label("score"),
+        )
+        .where(or_(
+            document.op("@@")(tsquery),
+            *(literal(query).op("<%")(column) for column in columns),
+        ))
+    )
+
+
+def _search_postgres(session: Session, query: str, entities: list[SearchEntityEnum],
+                     offset: int, limit: int) -> tuple[list[SearchHit], int]:
+    matches = union_all(*(_entity_statement(entity, query) for entity in entities)).subquery("matches")
+    statement = (
+        select(matches, func.count().over().label("total"))
+        .order_by(matches.c.score.desc(), matches.c.entity, matches.c.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    rows = session.exec(statement).all()
+    hits = [
+        SearchHit(entity=row.entity, id=row.id, title=row.title, description=row.description, score=row.score)
+        for row in rows
+    ]
+    return hits, rows[0].total if rows else 0
+
+
+def _search_in_memory(session: Session, query: str, entities: list[SearchEntityEnum],
+                      offset: int, limit: int) -> tuple[list[SearchHit], int]:
+    index = InMemorySearchIndex()
+    for entity in entities:
+        model = SEARCH_MODELS[entity]
+        for row in session.exec(select(model)).all():
+            index.add(SearchDocument(entity=entity.value, id=row.id, title=row.title,
+                                     description=getattr(row, "description", None)))
+
+    results = index.search(query)
+    hits = [
+        SearchHit(entity=document.entity, id=document.id, title=document.title,
+                  description=document.description, score=score)
+        for document, score in results[offset:offset + limit]
+    ]
+    return hits, len(results)
+
+
+def search_catalog(session: Session, query: str, entities: list[SearchEntityEnum] | None = None,
+                   offset: int = 0, limit: int = 20) -> tuple[list[SearchHit], int]:
+    entities = entities or list(SearchEntityEnum)
+    if session.get_bind().dialect.name == "postgresql":
+        return _search_postgres(session, query, entities, offset, limit)
+    return _search_in_memory(session, query, entities, offset, limit)
@@ -0,0 +1,20 @@
+from sqlmodel import Session, select
+from app.models import Story
+
+
+def get_stories(session: Session):
+    """
+    Returns plain rows with the columns the catalog needs; rows are not tracked by the session.
+    """
+    statement = (
+        select(
+            Story.id,
+            Story.title,
+            Story.description,
+            Story.picture_small_url,
+            Story.picture_big_url,
+            Story.created_at,
+        )
+        .order_by(Story.created_at.desc())
+    )
+    return session.exec(statement).all()
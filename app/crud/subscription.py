@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, literal, update
+from sqlmodel import Session, select
+
+from app.models import Payment, Plan, Subscription
+
+# Matches Subscription.renew_subscription: one month is counted as 30 days.
+RENEWAL_MONTH = timedelta(days=30)
+
+
+def get_active_subscription(session: Session, user_id: int, now: datetime) -> tuple[Subscription, Plan] | None:
+    statement = (
+        select(Subscription, Plan)
+        .join(Plan, Plan.id == Subscription.plan_id)
+        .where(Subscription.user_id == user_id)
+        .where(Subscription.end_date >= now)
+        .order_by(Subscription.end_date.desc())
+        .limit(1)
+    )
+    return session.exec(statement).first()
+
+
+def renew_due_subscriptions_batch(session: Session, now: datetime, after_id: int,
+                                  batch_size: int = 1000) -> list[tuple[int, int]]:
+    """
+    Renews the next keyset batch of due auto_renew subscriptions in one statement
+    and creates their pending payments. Returns (subscription_id, user_id) pairs.
+
+    The caller owns the transaction and should commit after each batch.
+    """
+    due = (
+        select(Subscription.id)
+        .where(Subscription.auto_renew.is_(True))
+        .where(Subscription.end_date <= now)
+        .where(Subscription.id > after_id)
+        .order_by(Subscription.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("due")
+    )
+    renewed = (
+        update(Subscription)
+        .where(Subscription.id == due.c.id)
+        .where(Subscription.plan_id == Plan.id)
+        .values(start_date=now, end_date=now + Plan.duration_months * RENEWAL_MONTH)
+        .returning(Subscription.id, Subscription.user_id, Plan.price)
+        .cte("renewed")
+    )
+    payments = (
+        insert(Payment)
+        .from_select(
+            ["user_id", "subscription_id", "amount", "payment_date", "status"],
+            select(renewed.c.user_id, renewed.c.id, renewed.c.price, literal(now), literal("pending")),
+        )
+        .returning(Payment.subscription_id, Payment.user_id)
+    )
+    rows = session.execute(payments).all()
+    return sorted((subscription_id, user_id) for subscription_id, user_id in rows)
@@ -0,0 +1,60 @@
+from sqlalchemy import text
+from sqlmodel import Session, select, SQLModel
+
+from app.core.catalog_sync import SYNC_WATERMARK_QUERY
+from app.models import City, Dialogue, Mission, Place, Quest, Story, Tombstone
+
+SYNC_ENTITIES: dict[str, type[SQLModel]] = {
+    "cities": City,
+    "places": Place,
+    "stories": Story,
+    "quests": Quest,
+    "missions": Mission,
+    "dialogues": Dialogue,
+}
+
+
+def get_catalog_changes(session: Session, since: int, limit: int):
+    """
+    Returns (changes, tombstones, cursor, has_more) for rows with sync_version > since.
+
+    Only versions up to the watermark of finished transactions are served, so a
+    transaction still in flight can never commit a version below a returned cursor.
+    Every table is read with a range scan on its sync_version index. When any table has
+    more than `limit` changes, the cursor stops at the lowest version that was fully read
+    across all tables, so the next page continues without gaps.
+    """
+    watermark = session.execute(text(SYNC_WATERMARK_QUERY)).scalar()
+    if watermark <= since:
+        return {name: [] for name in SYNC_ENTITIES}, [], since, False
+
+    fetched: dict[str, list] = {}
+    for name, model in SYNC_ENTITIES.items():
+        statement = (
+            select(model)
+            .where(model.sync_version > since)
+            .where(model.sync_version <= watermark)
+            .order_by(model.sync_version)
+            .limit(limit)
+        )
+        fetched[name] = session.exec(statement).all()
+
+    statement = (
+        select(Tombstone)
+        .where(Tombstone.sync_version > since)
+        .where(Tombstone.sync_version <= watermark)
+        .order_by(Tombstone.sync_version)
+        .limit(limit)
+    )
+    fetched["deleted"] = session.exec(statement).all()
+
+    truncated = [rows[-1].sync_version for rows in fetched.values() if len(rows) == limit]
+    has_more = bool(truncated)
+    # Without truncation everything up to the watermark has been read.
+    cursor = min(truncated) if has_more else watermark
+
+    for name, rows in fetched.items():
+        fetched[name] = [row for row in rows if row.sync_version <= cursor]
+
+    tombstones = fetched.pop("deleted")
+    return fetched, tombstones, cursor, has_more
@@ -1,27 +1,51 @@
+from contextlib import contextmanager
+
 from loguru import logger
-from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, func, select
 from typing import Any
 
 from app.core.security import get_password_hash, verify_password
 from app.models import User, UserCreate, UserUpdate
 
 
+EMAIL_INDEX_NAMES = ("ix_user_email_lower", "ix_user_email")
+
+
+class EmailAlreadyExistsError(ValueError):
+    pass
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
-    statement = select(User).where(User.email == email)
+    # Matches ix_user_email_lower, so the lookup is an index scan.
+    statement = select(User).where(func.lower(User.email) == email.lower())
     session_user = session.exec(statement).first()
     return session_user
 
 
+@contextmanager
+def _unique_email(session: Session, email: str):
+    """
+    Turns a violation of the unique email indexes into EmailAlreadyExistsError. Writes rely
+    on the indexes instead of checking for duplicates first, which would cost a query and
+    still race with concurrent signups.
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        session.rollback()
+        constraint = getattr(getattr(e.orig, "diag", None), "constraint_name", None)
+        if constraint in EMAIL_INDEX_NAMES:
+            logger.warning(f"Attempt to use an existing email: {email}")
+            raise EmailAlreadyExistsError("The user with this email already exists in the system.")
+        raise
+
+
 def hash_user_password(password: str) -> str:
     return get_password_hash(password)
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
-    existing_user = get_user_by_email(session=session, email=user_create.email)
-    if existing_user:
-        logger.warning(f"Attempt to create a user with an existing email: {user_create.email}")
-        raise ValueError("The user with this email already exists in the system.")
-
     hashed_password = hash_user_password(user_create.password)
     db_obj = User(
         email=user_create.email,
@@ -30,8 +54,12 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
         hashed_password=hashed_password,
     )
     session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
+    with _unique_email(session, user_create.email):
+        # All defaults are set in Python and the id comes back from the INSERT, so the object
+        # is complete; keeping it out of the commit's expiry saves the reload query.
+        session.flush()
+        session.expunge(db_obj)
+        session.commit()
 
     logger.info(f"User created with email: {user_create.email}")
 
@@ -49,7 +77,8 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
 
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
-    session.commit()
+    with _unique_email(session, db_user.email):
+        session.commit()
     session.refresh(db_user)
 
     logger.info(f"User updated: {db_user.email}")
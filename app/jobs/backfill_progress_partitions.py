@@ -0,0 +1,143 @@
+"""
+Moves the user progress tables onto the hash-partitioned shadow tables created by
+migration e5b2c8a4d1f7, while the application keeps reading and writing the live tables
+(the mirror triggers carry those writes over). Three phases:
+
+1. copy: existing rows are copied in keyset batches by id;
+2. verify: every id range is compared with the live table and repaired, without locks;
+3. swap: the live tables are locked against writes (reads continue), the rows logged as
+   changed since verification started are re-copied, and the shadows are renamed into
+   place. The old tables stay as <table>_legacy for rollback.
+
+The swap only ever runs after a complete verification pass. The job is restartable: the
+phase and the position in it are checkpointed in Redis after every committed batch, and a
+new run resumes from them.
+
+Usage: python -m app.jobs.backfill_progress_partitions [--batch-size 5000] [--skip-swap]
+"""
+import argparse
+import asyncio
+import json
+
+from loguru import logger
+from sqlalchemy import inspect, text
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.partitioning import (
+    CHANGE_LOG_TABLE,
+    PARTITIONED_TABLES,
+    backfill_batch_sql,
+    shadow_table,
+    swap_sql,
+    verify_batch_sql,
+)
+from app.core.redis import redis_manager, RedisClient
+
+CHECKPOINT_KEY = "jobs:backfill_progress_partitions:checkpoint"
+
+
+async def load_checkpoint(redis: RedisClient) -> dict:
+    checkpoint = await redis.get(CHECKPOINT_KEY)
+    if not checkpoint:
+        return {"phase": "copy", "last_ids": {}}
+
+    data = json.loads(checkpoint)
+    logger.info(f"Resuming progress partition backfill from checkpoint: {data}")
+    return data
+
+
+async def save_checkpoint(redis: RedisClient, checkpoint: dict):
+    await redis.set(CHECKPOINT_KEY, json.dumps(checkpoint))
+
+
+async def copy_rows(session: Session, redis: RedisClient, checkpoint: dict, batch_size: int):
+    for table in PARTITIONED_TABLES:
+        statement = text(backfill_batch_sql(table))
+        last_id = checkpoint["last_ids"].get(table, 0)
+        while True:
+            batch_last_id, rows = session.execute(
+                statement, {"after_id": last_id, "batch_size": batch_size}
+            ).one()
+            session.commit()
+            if not rows:
+                break
+
+            last_id = checkpoint["last_ids"][table] = batch_last_id
+            await save_checkpoint(redis, checkpoint)
+            logger.info(f"Copied {rows} {table} rows, checkpoint at id {last_id}")
+
+
+async def verify_rows(session: Session, redis: RedisClient, checkpoint: dict, batch_size: int):
+    """
+    Rows written while a range is being verified are logged by the mirror trigger after
+    the watermark taken here, and are re-copied under the lock of the swap.
+    """
+    if "watermark" not in checkpoint:
+        checkpoint.update(
+            watermark=session.execute(text(f"SELECT coalesce(max(id), 0) FROM {CHANGE_LOG_TABLE}")).scalar(),
+            last_ids={},
+            max_ids={
+                table: session.execute(text(f"SELECT coalesce(max(id), 0) FROM {table}")).scalar()
+                for table in PARTITIONED_TABLES
+            },
+        )
+        session.commit()
+        await save_checkpoint(redis, checkpoint)
+
+    for table in PARTITIONED_TABLES:
+        delete_stale, insert_missing = (text(statement) for statement in verify_batch_sql(table))
+        last_id, max_id = checkpoint["last_ids"].get(table, 0), checkpoint["max_ids"][table]
+        while last_id < max_id:
+            bounds = {"after_id": last_id, "up_to_id": last_id + batch_size}
+            repaired = session.execute(delete_stale, bounds).rowcount
+            repaired += session.execute(insert_missing, bounds).rowcount
+            session.commit()
+
+            last_id = checkpoint["last_ids"][table] = bounds["up_to_id"]
+            await save_checkpoint(redis, checkpoint)
+            if repaired:
+                logger.info(f"Repaired {repaired} {table} rows with id <= {last_id}")
+        logger.info(f"Verified {table} up to id {max_id}")
+
+
+def swap_tables(session: Session, watermark: int):
+    for table in PARTITIONED_TABLES:
+        for statement in swap_sql(table):
+            session.execute(text(statement), {"watermark": watermark} if ":watermark" in statement else {})
+    session.execute(text(f"DROP TABLE {CHANGE_LOG_TABLE}"))
+    session.commit()
+
+
+async def backfill_progress_partitions(batch_size: int, swap: bool):
+    if not inspect(engine).has_table(shadow_table("userquest")):
+        logger.info("No partitioned shadow tables, nothing to backfill")
+        return
+
+    redis = redis_manager.get_client(db=settings.RedisDB.REDIS_CONTENT.value)
+    checkpoint = await load_checkpoint(redis)
+
+    with Session(engine) as session:
+        if checkpoint["phase"] == "copy":
+            await copy_rows(session, redis, checkpoint, batch_size)
+            checkpoint = {"phase": "verify", "last_ids": {}}
+            await save_checkpoint(redis, checkpoint)
+
+        await verify_rows(session, redis, checkpoint, batch_size)
+        if not swap:
+            logger.info("Verification finished, swap skipped; rerun without --skip-swap to swap")
+            return
+
+        swap_tables(session, checkpoint["watermark"])
+
+    await redis.delete(CHECKPOINT_KEY)
+    logger.info("Partitioned progress tables swapped in")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--skip-swap", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(backfill_progress_partitions(args.batch_size, swap=not args.skip_swap))
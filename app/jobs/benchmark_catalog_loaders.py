@@ -0,0 +1,95 @@
+"""
+Compares loading the catalog tables as ORM entities with the column-projected rows the
+catalog loaders return, over synthetic rows in an in-memory SQLite database. The numbers
+are relative: SQLite leaves out the network and Postgres, so they show the cost on the
+Python side only.
+
+Usage: python -m app.jobs.benchmark_catalog_loaders [--rows 20000] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import crud
+from app.models import Place, Story
+
+
+def fill(session: Session, rows: int):
+    now = datetime.utcnow()
+    session.execute(insert(Place), [
+        {
+            "title": f"Place {i}",
+            "description": "x" * 200,
+            "latitude": 55.0 + i / rows,
+            "longitude": 37.0 + i / rows,
+            "picture_small_url": f"places/{i}-small.jpg",
+            "picture_big_url": f"places/{i}-big.jpg",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+    session.execute(insert(Story), [
+        {
+            "title": f"Story {i}",
+            "description": "x" * 200,
+            "picture_small_url": f"stories/{i}-small.jpg",
+            "picture_big_url": f"stories/{i}-big.jpg",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def best_of(engine, load: Callable[[Session], list], repeat: int) -> float:
+    """
+    Best wall time of `repeat` loads, each in a fresh session like a catalog rebuild.
+    """
+    timings = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            load(session)
+            timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(rows: int, repeat: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[Place.__table__, Story.__table__])
+    with Session(engine) as session:
+        fill(session, rows)
+
+    loaders = {
+        "places": (
+            lambda session: session.exec(select(Place).order_by(Place.created_at.desc())).all(),
+            crud.get_places,
+        ),
+        "stories": (
+            lambda session: session.exec(select(Story).order_by(Story.created_at.desc())).all(),
+            crud.get_stories,
+        ),
+    }
+    for name, (entities, projected) in loaders.items():
+        before = best_of(engine, entities, repeat)
+        after = best_of(engine, projected, repeat)
+        logger.info(
+            f"{name}: {rows} rows, entities {before * 1000:.1f} ms, "
+            f"projected {after * 1000:.1f} ms ({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
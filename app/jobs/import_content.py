@@ -0,0 +1,43 @@
+"""
+Imports a content package (cities, quests, missions, dialogues, artifact pieces and media).
+
+Usage: python -m app.jobs.import_content <package.ndjson | package.csv | package.zip | directory>
+"""
+import argparse
+import asyncio
+import sys
+
+from loguru import logger
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.core.catalog import publish_catalog_change
+from app.core.config import settings
+from app.core.content_import import ContentImportError, ContentPackage, import_content
+from app.core.db import engine
+from app.core.redis import redis_manager
+
+
+async def run_import(path: str) -> int:
+    package = ContentPackage(path)
+    try:
+        with Session(engine) as session:
+            report = import_content(session, package, media_concurrency=settings.IMPORT_MEDIA_CONCURRENCY)
+    except ContentImportError as e:
+        for error in e.errors:
+            logger.error(error)
+        return 1
+    except IntegrityError as e:
+        logger.error(f"Content package violates a constraint: {e.orig}")
+        return 1
+
+    await publish_catalog_change(redis_manager.get_client(db=settings.RedisDB.REDIS_CONTENT.value))
+    logger.info(f"Imported {report.counts}, {report.media_uploaded} media files")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run_import(args.path)))
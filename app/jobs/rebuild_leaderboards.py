@@ -0,0 +1,50 @@
+"""
+Recomputes the Redis leaderboards from Postgres.
+
+Usage: python -m app.jobs.rebuild_leaderboards [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import itertools
+from typing import AsyncIterator, Iterator, TypeVar
+
+from loguru import logger
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.core.leaderboard import rebuild_leaderboard
+from app.core.redis import redis_manager
+from app.models import LeaderboardMetricEnum
+
+T = TypeVar("T")
+
+
+async def fetch_in_thread(rows: Iterator[T], batch_size: int) -> AsyncIterator[T]:
+    """
+    Pulls a blocking iterator (e.g. a server-side cursor) in batches on a worker thread,
+    so the database round trips do not stall the event loop the job runs on.
+    """
+    while True:
+        batch = await asyncio.to_thread(lambda: list(itertools.islice(rows, batch_size)))
+        if not batch:
+            return
+        for row in batch:
+            yield row
+
+
+async def rebuild_all(batch_size: int):
+    redis = redis_manager.get_client(db=settings.RedisDB.REDIS_CONTENT.value)
+    with Session(engine) as session:
+        for metric in LeaderboardMetricEnum:
+            rows = fetch_in_thread(crud.stream_leaderboard_scores(session, metric, batch_size=batch_size), batch_size)
+            processed = await rebuild_leaderboard(redis, metric, rows, batch_size=batch_size)
+            logger.info(f"Rebuilt '{metric.value}' leaderboard from {processed} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(rebuild_all(args.batch_size))
@@ -0,0 +1,68 @@
+"""
+Renews due auto_renew subscriptions in keyset batches and creates their pending payments.
+
+The job is restartable: the cutoff time and the last processed subscription id are
+checkpointed in Redis after every committed batch, and a new run resumes from them.
+
+Usage: python -m app.jobs.renew_subscriptions [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime
+
+from loguru import logger
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.core.entitlements import entitlement_cache
+from app.core.redis import redis_manager, RedisClient
+
+CHECKPOINT_KEY = "jobs:renew_subscriptions:checkpoint"
+
+
+async def load_checkpoint(redis: RedisClient) -> tuple[datetime, int]:
+    checkpoint = await redis.get(CHECKPOINT_KEY)
+    if not checkpoint:
+        return datetime.utcnow(), 0
+
+    data = json.loads(checkpoint)
+    logger.info(f"Resuming subscription renewal from checkpoint: {data}")
+    return datetime.fromisoformat(data["cutoff"]), data["last_id"]
+
+
+async def save_checkpoint(redis: RedisClient, cutoff: datetime, last_id: int):
+    await redis.set(CHECKPOINT_KEY, json.dumps({"cutoff": cutoff.isoformat(), "last_id": last_id}))
+
+
+async def renew_subscriptions(batch_size: int) -> int:
+    redis = redis_manager.get_client(db=settings.RedisDB.REDIS_CONTENT.value)
+    cutoff, last_id = await load_checkpoint(redis)
+
+    total = 0
+    with Session(engine) as session:
+        while True:
+            renewed = crud.renew_due_subscriptions_batch(session, now=cutoff, after_id=last_id,
+                                                         batch_size=batch_size)
+            session.commit()
+            if not renewed:
+                break
+
+            last_id = renewed[-1][0]
+            total += len(renewed)
+            await save_checkpoint(redis, cutoff, last_id)
+            await entitlement_cache.invalidate(redis, *{user_id for _, user_id in renewed})
+            logger.info(f"Renewed {len(renewed)} subscriptions, checkpoint at id {last_id}")
+
+    await redis.delete(CHECKPOINT_KEY)
+    logger.info(f"Subscription renewal finished: {total} subscriptions renewed")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(renew_subscriptions(args.batch_size))
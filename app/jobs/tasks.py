@@ -0,0 +1,51 @@
+"""
+Job definitions executed by the background worker (python -m app.worker).
+"""
+import asyncio
+from datetime import timedelta
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.core.db_routing import replica_router
+from app.core.quest_bundle import quest_bundle_store
+from app.core.queue import job_queue
+from app.core.redis import redis_manager
+from app.core.warmup import store_popular_quest_ids
+from app.jobs.rebuild_leaderboards import rebuild_all
+from app.models import LeaderboardRebuildJobPayload, PopularQuestsJobPayload, QuestBundleJobPayload
+
+
+def _build_quest_bundle(quest_id: int) -> dict | None:
+    with Session(engine) as session:
+        bundle = quest_bundle_store.build(session, quest_id)
+    return bundle.model_dump() if bundle else None
+
+
+@job_queue.job(payload=QuestBundleJobPayload, timeout=120)
+async def rebuild_quest_bundle(payload: QuestBundleJobPayload) -> dict | None:
+    return await asyncio.to_thread(_build_quest_bundle, payload.quest_id)
+
+
+@job_queue.job(payload=LeaderboardRebuildJobPayload, retries=1, timeout=30 * 60)
+async def rebuild_leaderboards(payload: LeaderboardRebuildJobPayload) -> None:
+    await rebuild_all(payload.batch_size)
+
+
+def _get_popular_quest_ids(limit: int) -> list[int]:
+    with Session(replica_router.get_read_engine()) as session:
+        return crud.get_popular_quest_ids(session, limit)
+
+
+@job_queue.job(payload=PopularQuestsJobPayload, timeout=10 * 60)
+async def refresh_popular_quests(payload: PopularQuestsJobPayload) -> int:
+    """
+    Precomputes the quests that API workers warm up on start, so the grouping over all
+    user quests runs once here instead of in every worker.
+    """
+    quest_ids = await asyncio.to_thread(_get_popular_quest_ids, payload.limit)
+    redis = redis_manager.get_client(db=settings.RedisDB.REDIS_CONTENT.value)
+    await store_popular_quest_ids(redis, quest_ids, timedelta(seconds=settings.WARMUP_POPULAR_QUESTS_TTL_SECONDS))
+    return len(quest_ids)
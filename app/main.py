@@ -8,7 +8,15 @@ from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.core.catalog import catalog_store
 from app.core.config import settings
+from app.core.events import event_hub
+from app.core.db import engine
+from app.core.entitlements import entitlement_cache
+from app.core.profiling import ProfilingMiddleware
+from app.core.lifespan import lifespan, on_startup, on_shutdown
+from app.core.redis import redis_manager
+from app.core.warmup import warmup
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -18,6 +26,7 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -27,9 +36,56 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware, sample_rate=settings.PROFILING_SAMPLE_RATE)
 
 os.environ['SQLALCHEMY_WARN_20'] = 'yes'
 if not sys.warnoptions:
     warnings.simplefilter("default")
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+@on_startup
+async def start_catalog_listener():
+    catalog_store.start_listener()
+
+
+@on_startup
+async def start_event_listener():
+    event_hub.start_listener()
+
+
+@on_startup
+async def start_entitlement_listener():
+    entitlement_cache.start_listener()
+
+
+@on_startup
+async def start_warmup():
+    warmup.start()
+
+
+@on_shutdown
+async def close_connections():
+    await redis_manager.close()
+    engine.dispose()
+
+
+@on_shutdown
+async def stop_catalog_listener():
+    await catalog_store.stop_listener()
+
+
+@on_shutdown
+async def stop_event_listener():
+    await event_hub.stop_listener()
+
+
+@on_shutdown
+async def stop_entitlement_listener():
+    await entitlement_cache.stop_listener()
+
+
+@on_shutdown
+async def stop_warmup():
+    await warmup.stop()
@@ -1,7 +1,9 @@
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import BigInteger, Index, func, text
 from pydantic import EmailStr, condecimal
 from datetime import datetime, timedelta
 from enum import Enum
+from typing import Any
 
 
 class Plan(SQLModel, table=True):
@@ -55,6 +57,8 @@ class Dialogue(SQLModel, table=True):
     background_url: str = Field(max_length=255)
     character_image_url: str = Field(max_length=255)
     order: int = Field(default=0)  # Порядок вызова диалогов
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int | None = Field(default=None, index=True, sa_type=BigInteger)  # Версия изменения для /sync, выставляется триггером
 
     mission: 'Mission' = Relationship(back_populates="dialogues")
 
@@ -71,6 +75,51 @@ class MissionStatusEnum(str, Enum):
     failed = "failed"
 
 
+class LeaderboardMetricEnum(str, Enum):
+    quests = "quests"
+    artifacts = "artifacts"
+
+
+class SearchEntityEnum(str, Enum):
+    places = "places"
+    stories = "stories"
+    quests = "quests"
+    cities = "cities"
+
+
+class ExportEntityEnum(str, Enum):
+    places = "places"
+    stories = "stories"
+    quests = "quests"
+    user_quests = "user_quests"
+    user_missions = "user_missions"
+
+
+class ExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class GeofenceEntityEnum(str, Enum):
+    places = "places"
+    missions = "missions"
+
+
+class EventTypeEnum(str, Enum):
+    progress = "progress"  # миссия или квест завершены
+    artifact = "artifact"  # получен фрагмент артефакта
+    achievement = "achievement"
+    catalog = "catalog"
+
+
+class HomeSectionEnum(str, Enum):
+    me = "me"
+    cities = "cities"
+    stories = "stories"
+    places = "places"
+    quests = "quests"
+
+
 class CityBase(SQLModel):
     title: str
     latitude: float
@@ -82,6 +131,8 @@ class City(CityBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
     description: str | None = Field(default=None, max_length=500)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int | None = Field(default=None, index=True, sa_type=BigInteger)  # Версия изменения для /sync, выставляется триггером
 
     quests: list["Quest"] = Relationship(back_populates="city")
 
@@ -124,6 +175,9 @@ class Quest(SQLModel, table=True):
     title: str = Field(max_length=255)
     description: str | None = Field(default=None, max_length=500)
     city_id: int = Field(foreign_key="city.id")
+    is_premium: bool = Field(default=False)  # Доступен только с активной подпиской
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int | None = Field(default=None, index=True, sa_type=BigInteger)  # Версия изменения для /sync, выставляется триггером
     city: City | None = Relationship(back_populates="quests")
     missions: list["Mission"] = Relationship(back_populates="quest")
 
@@ -135,6 +189,14 @@ class QuestPublic(SQLModel):
     description: str | None
     picture_small_url: str
     city: str
+    is_premium: bool = False
+
+
+class QuestBundlePublic(SQLModel):
+    quest_id: int
+    hash: str
+    url: str
+    size: int
 
 
 class Mission(SQLModel, table=True):
@@ -145,6 +207,9 @@ class Mission(SQLModel, table=True):
     mission_order: int = Field()  # Порядок вызова миссий в квесте
     reward_artifact_piece_id: int | None = Field(foreign_key="artifactpiece.id")
     city_id: int | None = Field(foreign_key="city.id")
+    geofence_radius: float | None = Field(default=None)  # Радиус геозоны вокруг города миссии (или квеста) в метрах, без него миссия не срабатывает по геолокации
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int | None = Field(default=None, index=True, sa_type=BigInteger)  # Версия изменения для /sync, выставляется триггером
 
     quest: Quest = Relationship(back_populates="missions")
     city: City | None = Relationship()
@@ -159,8 +224,14 @@ class Achievement(SQLModel, table=True):
 
 
 class UserAchievement(SQLModel, table=True):
-    id: int | None = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    # Секционирована по хешу user_id, как и UserQuest
+    __table_args__ = (
+        Index("ix_userachievement_user_id_achievement_id", "user_id", "achievement_id", unique=True),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
+
+    id: int | None = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
     achievement_id: int = Field(foreign_key="achievement.id")
     progress: int = Field(default=0)
     unit_of_measurement: str | None = Field(max_length=50)
@@ -170,8 +241,14 @@ class UserAchievement(SQLModel, table=True):
 
 
 class UserQuest(SQLModel, table=True):
-    id: int | None = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    # Секционирована по хешу user_id, поэтому user_id входит в первичный ключ и уникальные индексы
+    __table_args__ = (
+        Index("ix_userquest_user_id_quest_id", "user_id", "quest_id", unique=True),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
+
+    id: int | None = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
     quest_id: int = Field(foreign_key="quest.id")
     status: QuestStatusEnum = Field(default=QuestStatusEnum.in_progress)
 
@@ -180,8 +257,14 @@ class UserQuest(SQLModel, table=True):
 
 
 class UserMission(SQLModel, table=True):
-    id: int | None = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    # Секционирована по хешу user_id, как и UserQuest
+    __table_args__ = (
+        Index("ix_usermission_user_id_mission_id", "user_id", "mission_id", unique=True),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
+
+    id: int | None = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
     mission_id: int = Field(foreign_key="mission.id")
     status: MissionStatusEnum = Field(default=MissionStatusEnum.in_progress)
 
@@ -190,7 +273,7 @@ class UserMission(SQLModel, table=True):
 
 
 class UserBase(SQLModel):
-    email: EmailStr = Field(unique=True, index=True, max_length=255)
+    email: EmailStr = Field(max_length=255)
     first_name: str | None = Field(default=None, max_length=255)
     last_name: str | None = Field(default=None, max_length=255)
     phone: str | None = Field(default=None, max_length=20)
@@ -198,9 +281,14 @@ class UserBase(SQLModel):
 
 
 class User(UserBase, table=True):
+    __table_args__ = (
+        Index("ix_user_email_lower", func.lower(text("email")), unique=True),  # Email уникален без учёта регистра
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     hashed_password: str = Field(max_length=255)
     disabled: bool = Field(default=False)
+    is_superuser: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime | None = Field(default=None)
 
@@ -256,6 +344,8 @@ class Story(SQLModel, table=True):
     picture_small_url: str = Field(max_length=255)  # Превью изображение (маленькое)
     picture_big_url: str = Field(max_length=255)  # Полное изображение (большое)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int | None = Field(default=None, index=True, sa_type=BigInteger)  # Версия изменения для /sync, выставляется триггером
 
     class ConfigDict:
         json_encoders = {
@@ -288,7 +378,10 @@ class Place(PlaceBase, table=True):
     description: str | None = Field(default=None, max_length=500)
     picture_small_url: str = Field(max_length=255)
     picture_big_url: str = Field(max_length=255)
+    geofence_radius: float = Field(default=50.0)  # Радиус геозоны в метрах
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int | None = Field(default=None, index=True, sa_type=BigInteger)  # Версия изменения для /sync, выставляется триггером
 
     class ConfigDict:
         arbitrary_types_allowed = True
@@ -303,6 +396,172 @@ class PlaceDetailPublic(PlaceBase):
     description: str | None
 
 
+class Tombstone(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+    entity: str = Field(max_length=50)  # Имя таблицы удалённой записи
+    entity_id: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int | None = Field(default=None, index=True, sa_type=BigInteger)
+
+
+class TombstonePublic(SQLModel):
+    entity: str
+    entity_id: int
+    deleted_at: datetime
+
+
+class SyncChangesPublic(SQLModel):
+    cursor: int
+    has_more: bool
+    changes: dict[str, list[dict]]
+    deleted: list[TombstonePublic]
+
+
+class SearchHit(SQLModel):
+    entity: SearchEntityEnum
+    id: int
+    title: str
+    description: str | None
+    score: float
+
+
+class SearchResultsPublic(SQLModel):
+    data: list[SearchHit]
+    count: int
+
+
+class MapMarker(SQLModel):
+    entity: SearchEntityEnum  # places или cities
+    id: int
+    title: str
+    picture_small_url: str
+    latitude: float
+    longitude: float
+
+
+class MapCluster(SQLModel):
+    latitude: float  # Центроид маркеров кластера
+    longitude: float
+    count: int
+    item: MapMarker  # Представитель кластера
+
+
+class MapClustersPublic(SQLModel):
+    data: list[MapCluster]
+    count: int
+    zoom: int
+
+
+class LocationPing(SQLModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    accuracy: float | None = Field(default=None, ge=0)  # Точность геолокации в метрах
+    recorded_at: datetime | None = None
+
+
+class CheckInRequest(SQLModel):
+    pings: list[LocationPing] = Field(min_length=1, max_length=100)
+
+
+class GeofenceTrigger(SQLModel):
+    entity: GeofenceEntityEnum
+    id: int
+    recorded_at: datetime | None = None  # Время первого пинга внутри геозоны
+
+
+class CheckInResult(SQLModel):
+    data: list[GeofenceTrigger]
+    count: int
+
+
+class CityImport(SQLModel):
+    id: int
+    title: str = Field(max_length=255)
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    picture_small_url: str = Field(max_length=255)
+    description: str | None = Field(default=None, max_length=500)
+
+
+class ArtifactImport(SQLModel):
+    id: int
+    name: str = Field(max_length=255)
+    description: str | None = Field(default=None, max_length=500)
+
+
+class ArtifactPieceImport(SQLModel):
+    id: int
+    artifact_id: int
+    name: str = Field(max_length=255)
+    description: str | None = Field(default=None, max_length=500)
+
+
+class QuestImport(SQLModel):
+    id: int
+    title: str = Field(max_length=255)
+    description: str | None = Field(default=None, max_length=500)
+    city_id: int
+    is_premium: bool = False
+
+
+class MissionImport(SQLModel):
+    id: int
+    quest_id: int
+    name: str = Field(max_length=255)
+    description: str | None = Field(default=None, max_length=500)
+    mission_order: int
+    reward_artifact_piece_id: int | None = None
+    city_id: int | None = None
+
+
+class DialogueImport(SQLModel):
+    id: int
+    mission_id: int
+    character_name: str = Field(max_length=255)
+    text: str = Field(max_length=500)
+    background_url: str = Field(max_length=255)
+    character_image_url: str = Field(max_length=255)
+    order: int = Field(default=0)
+
+
+class MediaImport(SQLModel):
+    bucket: str = Field(max_length=63)
+    object_name: str = Field(max_length=255)
+    path: str  # Путь к файлу внутри пакета
+    content_type: str | None = None
+
+
+class ImportReport(SQLModel):
+    counts: dict[str, int]
+    media_uploaded: int
+
+
+class QuestBundleJobPayload(SQLModel):
+    quest_id: int
+
+
+class LeaderboardRebuildJobPayload(SQLModel):
+    batch_size: int = 1000
+
+
+class PopularQuestsJobPayload(SQLModel):
+    limit: int
+
+
+class JobAccepted(SQLModel):
+    job_id: str
+    status_url: str
+
+
+class JobStatusPublic(SQLModel):
+    job_id: str
+    name: str
+    status: str  # статусы: "queued", "running", "retrying", "succeeded", "failed"
+    attempts: int
+    result: Any | None = None
+    error: str | None = None
+
+
 class Token(SQLModel):
     access_token: str
     token_type: str = "bearer"
@@ -312,5 +571,77 @@ class TokenPayload(SQLModel):
     sub: int | None = None
 
 
+class StreamTicket(SQLModel):
+    ticket: str
+    expires_in: int  # секунды, за которые нужно открыть поток событий
+
+
 class Message(SQLModel):
     message: str
+
+
+class LeaderboardEntry(SQLModel):
+    user_id: int
+    score: int
+    rank: int
+
+
+class LeaderboardPublic(SQLModel):
+    data: list[LeaderboardEntry]
+    count: int
+    me: LeaderboardEntry | None
+
+
+class ArtifactProgress(SQLModel):
+    id: int
+    name: str
+    total_pieces: int
+    collected_pieces: int
+    collected_piece_ids: list[int]
+    complete: bool
+
+
+class ArtifactCollectionPublic(SQLModel):
+    data: list[ArtifactProgress]
+    completed_count: int  # Количество собранных целиком артефактов
+
+
+class MissionCompletionPublic(SQLModel):
+    mission_id: int
+    newly_completed: bool  # False, если миссия уже была выполнена
+    reward_artifact_piece_id: int | None = None  # Выданная часть артефакта, если она новая
+    artifact: ArtifactProgress | None = None  # Прогресс артефакта выданной части
+    quest_completed: bool
+
+
+class HealthPublic(SQLModel):
+    status: str  # ok или degraded, если цепь Redis разомкнута
+    breakers: dict[str, dict[str, Any]]
+    token_revocation: dict[str, Any]
+    redis_commands: dict[str, dict[str, Any]]  # Задержки команд Redis в этом воркере
+
+
+class WarmupStepPublic(SQLModel):
+    name: str
+    status: str  # ok, failed, timed_out или skipped, если бюджет времени исчерпан
+    duration_ms: float
+    detail: str  # Что было прогрето или текст ошибки
+
+
+class ReadinessPublic(SQLModel):
+    ready: bool  # True, когда прогрев завершили все воркеры сервера, даже если часть шагов не удалась
+    workers: int
+    workers_ready: int
+    budget_seconds: float
+    duration_ms: float
+    steps: list[WarmupStepPublic]
+
+
+class HomeSectionPublic(SQLModel):
+    etag: str
+    not_modified: bool  # True, если ETag совпал с присланным в If-None-Match, тогда data пустое
+    data: Any = None  # Тело, как в соответствующем отдельном эндпоинте
+
+
+class HomePublic(SQLModel):
+    sections: dict[HomeSectionEnum, HomeSectionPublic]
@@ -0,0 +1,67 @@
+"""
+Production server entry point: a multi-worker uvicorn with uvloop and httptools.
+
+Usage: python -m app.serve
+"""
+import os
+import random
+import tempfile
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS
+    # Respects the CPU set the container is limited to.
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+class Server(uvicorn.Server):
+    """
+    uvicorn server that adds a random jitter of up to SERVER_MAX_REQUESTS_JITTER to the
+    request limit of each worker, so workers started together are not recycled together.
+    """
+
+    def run(self, sockets=None):
+        if self.config.limit_max_requests is not None:
+            self.config.limit_max_requests += random.randint(0, settings.SERVER_MAX_REQUESTS_JITTER)
+        super().run(sockets=sockets)
+
+
+def main():
+    workers = worker_count()
+    # Workers read these on import, so /health/ready reports the readiness of all of them.
+    os.environ["SERVER_WORKERS"] = str(workers)
+    os.environ["SERVER_READINESS_DIR"] = tempfile.mkdtemp(prefix="readiness-")
+    config = uvicorn.Config(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        # On SIGTERM workers stop accepting connections and drain in-flight requests.
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        # Workers are recycled after this many requests (plus jitter) to contain memory growth.
+        limit_max_requests=settings.SERVER_MAX_REQUESTS,
+        # X-Forwarded-* headers are only trusted from these proxy addresses.
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        log_level="info",
+    )
+    server = Server(config=config)
+    if config.workers > 1:
+        # Every worker process runs its own copy of the server, and so draws its own jitter.
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Background job worker.
+
+Usage: python -m app.worker [--concurrency 10]
+"""
+import argparse
+import asyncio
+import signal
+
+from loguru import logger
+
+import app.jobs.tasks  # noqa: F401 registers the job definitions
+from app.core.config import settings
+from app.core.queue import job_queue
+from app.core.redis import redis_manager
+
+
+async def main(concurrency: int):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info(f"Worker started with concurrency {concurrency}, jobs: {sorted(job_queue.definitions)}")
+    try:
+        await job_queue.run_worker(concurrency, stop=stop)
+    finally:
+        await redis_manager.close()
+    logger.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))